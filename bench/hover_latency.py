@@ -0,0 +1,120 @@
+"""
+Hover latency benchmark for HarmonicPlot.
+
+Times the nearest-sample lookup used by HarmonicPlot._on_mouse_move at
+growing series sizes, and the old linear scan for comparison:
+
+    python -m bench.hover_latency
+    python -m bench.hover_latency --sizes 1000 100000 --plot
+    python -m bench.hover_latency --sweep 10
+"""
+import argparse
+import time
+import numpy as np
+
+from utils.utils import NearestIndex
+
+
+def time_lookups(index: NearestIndex, targets: np.ndarray) -> float:
+    """Mean seconds per lookup over targets."""
+    start = time.perf_counter()
+    for target in targets:
+        index.nearest(target)
+    return (time.perf_counter() - start) / len(targets)
+
+
+def time_linear(x: np.ndarray, targets: np.ndarray) -> float:
+    """Mean seconds per lookup with the previous pure-Python scan."""
+    start = time.perf_counter()
+    for target in targets:
+        min(range(len(x)), key=lambda i: abs(x[i] - target))
+    return (time.perf_counter() - start) / len(targets)
+
+
+def time_plot_hover(n: int, moves: int) -> float:
+    """Mean seconds per mouse move through a real HarmonicPlot."""
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QPointF
+    from widgets.harmonic_plot import HarmonicPlot
+
+    app = QApplication.instance() or QApplication([])
+    x = np.arange(n, dtype=np.float64)
+    plot = HarmonicPlot(x_vals=x, is_datetime=False)
+    plot.resize(780, 386)
+    plot.addNewLines(np.sin(x / 50), data_label="series", units=None)
+    plot.vb.setRange(xRange=(0, n), padding=0)
+    app.processEvents()
+    rect = plot.sceneBoundingRect()
+    xs = np.random.uniform(rect.left() + 1, rect.right() - 1, moves)
+    y = rect.center().y()
+    start = time.perf_counter()
+    for scene_x in xs:
+        plot._on_mouse_move(QPointF(scene_x, y))
+    return (time.perf_counter() - start) / moves
+
+
+def sweep(charts: int, n: int, seconds: float = 1.0) -> None:
+    """
+    Sweep the mouse across several plots through the coalescing path.
+
+    Raw move events are fed as fast as the event loop allows; the report
+    shows how many of them turned into hover updates.
+    """
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QPointF
+    from widgets.harmonic_plot import HarmonicPlot
+
+    app = QApplication.instance() or QApplication([])
+    x = np.arange(n, dtype=np.float64)
+    plots = []
+    for _ in range(charts):
+        plot = HarmonicPlot(x_vals=x, is_datetime=False)
+        plot.resize(780, 386)
+        plot.addNewLines(np.sin(x / 50), data_label="series", units=None)
+        plots.append(plot)
+    app.processEvents()
+
+    updates = [0]
+    for plot in plots:
+        plot.mouse_moved_signal.connect(lambda values: updates.__setitem__(0, updates[0] + 1))
+    raw = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for plot in plots:
+            rect = plot.sceneBoundingRect()
+            scene_x = rect.left() + 1 + (raw % int(rect.width() - 2))
+            plot.scene().sigMouseMoved.emit(QPointF(scene_x, rect.center().y()))
+        raw += 1
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    print(f"{charts} charts: {raw * charts} raw moves -> {updates[0]} hover updates in {elapsed:.2f}s "
+          f"({updates[0] / elapsed / charts:.0f}/s per chart)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark hover lookups")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--linear-max", type=int, default=100_000, help="largest size to time the old scan at")
+    parser.add_argument("--plot", action="store_true", help="also time the full HarmonicPlot hover path")
+    parser.add_argument("--sweep", type=int, metavar="CHARTS", help="sweep the mouse across CHARTS plots instead")
+    args = parser.parse_args()
+
+    if args.sweep:
+        sweep(args.sweep, args.sizes[0])
+        return
+
+    rng = np.random.default_rng(0)
+    print(f"{'points':>12} {'sorted us':>10} {'unsorted us':>12} {'linear us':>10} {'plot us':>9}")
+    for n in args.sizes:
+        x = np.cumsum(rng.uniform(0.5, 1.5, n))
+        targets = rng.uniform(x[0], x[-1], args.lookups)
+        sorted_us = time_lookups(NearestIndex(x), targets) * 1e6
+        unsorted_us = time_lookups(NearestIndex(rng.permutation(x)), targets) * 1e6
+        linear_us = time_linear(x, targets[:10]) * 1e6 if n <= args.linear_max else float("nan")
+        plot_us = time_plot_hover(n, 1000) * 1e6 if args.plot else float("nan")
+        print(f"{n:>12,} {sorted_us:>10.2f} {unsorted_us:>12.2f} {linear_us:>10.0f} {plot_us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Concurrent load test for the client request layer.
+
+Drives gestalt_get, gestalt_post or gestalt_post_stream from a pool of worker
+threads and reports latency percentiles and throughput:
+
+    python -m bench.load_test --spawn-server --latency-ms 20 --concurrency 16 --requests 500
+    python -m bench.load_test --endpoint http://127.0.0.1:8765/harmonic --mode stream
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import time
+import numpy as np
+
+
+def run(mode: str, concurrency: int, total: int, token: str) -> dict:
+    """
+    Issue total requests from concurrency threads.
+
+    Args:
+        mode: "get", "post" or "stream"
+        concurrency: Number of worker threads
+        total: Number of requests
+        token: Bearer token from login
+
+    Returns:
+        Latency percentiles in milliseconds, throughput and error count
+    """
+    from utils.app_requests import gestalt_get, gestalt_post, gestalt_post_stream
+
+    def one(i: int) -> float:
+        start = time.perf_counter()
+        if mode == "get":
+            # A distinct payload per request so the cache and coalescing stay out of the way
+            result = gestalt_get(token, {"config_name": "bench", "brand": "lume", "nonce": i,
+                                         "startdate": "2023-01-01", "enddate": "2023-12-31"})
+            if result is None:
+                raise RuntimeError("request failed")
+        elif mode == "post":
+            gestalt_post(token, {"config_name": "bench", "batch": False, "nonce": i})
+        else:
+            for _ in gestalt_post_stream(token, "/stream", {"nonce": i}):
+                pass
+        return time.perf_counter() - start
+
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = [executor.submit(one, i) for i in range(total)]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]) if len(latencies_ms) else (np.nan,) * 3
+    return {
+        "requests": total,
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the harmonic client")
+    parser.add_argument("--endpoint", help="server base url, defaults to HARMONIC_SERVER or config.server_endpoint")
+    parser.add_argument("--spawn-server", action="store_true", help="start a local stub server in-process")
+    parser.add_argument("--mode", choices=["get", "post", "stream"], default="get")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--points", type=int, default=None, help="stub server samples per series")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="stub server injected latency")
+    parser.add_argument("--username", default="bench")
+    parser.add_argument("--password", default="bench")
+    args = parser.parse_args()
+
+    if args.spawn_server:
+        from bench.stub_server import StubSettings, serve
+        server = serve(port=0, settings=StubSettings(points=args.points, latency_ms=args.latency_ms), background=True)
+        args.endpoint = f"http://127.0.0.1:{server.server_port}/harmonic"
+
+    from config import config
+    from utils import app_requests
+    from utils.app_requests import login, in_flight
+    from utils.transfer import transfer_log
+    if args.endpoint:
+        app_requests.server_endpoint = args.endpoint
+    config.performance.enable_cache = False
+    config.network.pool_maxsize = max(config.network.pool_maxsize, args.concurrency)
+
+    token = login(args.username, args.password)
+    if token is None or token.token is None:
+        raise SystemExit("login failed")
+
+    report = run(args.mode, args.concurrency, args.requests, token.token)
+    print(f"mode={args.mode} concurrency={args.concurrency} requests={report['requests']} errors={report['errors']}")
+    print(f"throughput {report['throughput']:.1f} req/s over {report['seconds']:.2f}s")
+    print(f"latency p50 {report['p50_ms']:.1f} ms  p95 {report['p95_ms']:.1f} ms  p99 {report['p99_ms']:.1f} ms")
+    for encoding, row in transfer_log.summary().items():
+        print(
+            f"{encoding}: {row['requests']} bodies, {row['wire_bytes'] / 1e6:.2f} MB on the wire, "
+            f"{row['body_bytes'] / 1e6:.2f} MB decoded, {row['decode_seconds'] * 1000:.1f} ms decoding"
+        )
+    print(f"coalescing: {in_flight.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Local stand-in for the harmonic server.
+
+Implements /token, /get, /post (including batched chart queries) and the
+streaming endpoints with synthetic data so the client can be exercised and
+benchmarked without the real server:
+
+    python -m bench.stub_server --port 8765 --points 5000 --latency-ms 20
+    HARMONIC_SERVER=http://127.0.0.1:8765/harmonic python main.py
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import datetime
+import gzip
+import json
+import random
+import threading
+import time
+import numpy as np
+
+from utils import wire_format
+from utils.utils import generate_fed_rates, generate_stock_data
+
+STUB_TOKEN = "stub-token"
+
+
+class StubSettings:
+    """Knobs shared by every request handler of a stub server."""
+
+    def __init__(
+        self,
+        prefix: str = "/harmonic",
+        points: Optional[int] = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        stream_tokens: int = 200,
+        stream_format: str = "sse",
+        compress: bool = True,
+        pause_every: int = 0,
+        pause_ms: float = 0.0
+    ) -> None:
+        self.prefix = prefix.rstrip("/")
+        self.points = points
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.stream_tokens = stream_tokens
+        self.stream_format = stream_format
+        self.compress = compress
+        self.pause_every = pause_every
+        self.pause_ms = pause_ms
+
+
+def generate_series(params: dict, points: Optional[int] = None):
+    """
+    Build synthetic (x, y) columns for a query.
+
+    The number of samples is taken from points, or else from the
+    startdate/enddate range of the query, one sample per day.
+    """
+    start = params.get("startdate", "2024-01-01")
+    if points is None:
+        end = params.get("enddate", "2024-12-31")
+        points = int((np.datetime64(end, "D") - np.datetime64(start, "D")).astype(int)) + 1
+    points = max(points, 1)
+    if "rate" in params.get("config_name", ""):
+        timestamps, values = generate_fed_rates(days=points)
+    else:
+        timestamps, values = generate_stock_data(days=points)
+    offset = datetime.datetime.fromisoformat(start).timestamp() - timestamps[0]
+    x = (np.asarray(timestamps) + offset).astype(np.int64).astype("datetime64[s]")
+    return x, np.asarray(values, dtype=np.float64)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    settings = StubSettings()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _route(self) -> Optional[str]:
+        path = urlsplit(self.path).path
+        if not path.startswith(self.settings.prefix):
+            return None
+        return path[len(self.settings.prefix):] or "/"
+
+    def _delay(self) -> None:
+        delay = self.settings.latency_ms + random.uniform(0, self.settings.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _pause(self, sent: int) -> None:
+        """Stall a streamed response after every pause_every charts or tokens."""
+        every = self.settings.pause_every
+        if every and self.settings.pause_ms > 0 and sent % every == 0:
+            time.sleep(self.settings.pause_ms / 1000)
+
+    def _authorized(self) -> bool:
+        if self.headers.get("Authorization") == f"Bearer {STUB_TOKEN}":
+            return True
+        self._send(401, b'{"detail":"Not authenticated"}', "application/json")
+        return False
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        encoding = None
+        if self.settings.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, 5)
+            encoding = "gzip"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def do_GET(self) -> None:
+        route = self._route()
+        if route != "/get":
+            self._send(404, b'{"detail":"Not Found"}', "application/json")
+            return
+        if not self._authorized():
+            return
+        self._delay()
+        params = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        x, y = generate_series(params, self.settings.points)
+        if wire_format.MEDIA_TYPE in self.headers.get("Accept", ""):
+            self._send(200, wire_format.encode_columns([x, y]), wire_format.MEDIA_TYPE)
+        else:
+            body = json.dumps([x.astype(np.int64).tolist(), y.tolist()]).encode()
+            self._send(200, body, "application/json")
+
+    def do_POST(self) -> None:
+        route = self._route()
+        body = self._read_body()
+        if route is None:
+            self._send(404, b'{"detail":"Not Found"}', "application/json")
+            return
+        if route == "/token":
+            form = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+            if not form.get("username") or not form.get("password"):
+                self._send(401, b'{"detail":"Incorrect username or password"}', "application/json")
+                return
+            self._send(200, json.dumps({"access_token": STUB_TOKEN, "token_type": "bearer"}).encode(), "application/json")
+            return
+        if not self._authorized():
+            return
+        self._delay()
+        payload = json.loads(body) if body else {}
+        if route == "/post" and payload.get("batch") and payload.get("charts"):
+            self._batch(payload["charts"])
+        elif route == "/post":
+            self._send(200, json.dumps({"status": "ok", "received": payload}).encode(), "application/json")
+        else:
+            self._stream(payload)
+
+    def _batch(self, charts: list) -> None:
+        """Answer a batched chart query one frame (or NDJSON line) per chart."""
+        binary = wire_format.BATCH_MEDIA_TYPE in self.headers.get("Accept", "")
+        self.send_response(200)
+        self.send_header("Content-Type", wire_format.BATCH_MEDIA_TYPE if binary else "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, chart in enumerate(charts):
+            x, y = generate_series(chart, self.settings.points)
+            if binary:
+                data = wire_format.encode_frame(index, [x, y])
+            else:
+                data = (json.dumps({"index": index, "columns": [x.astype(np.int64).tolist(), y.tolist()]}) + "\n").encode()
+            self._send_chunk(data)
+            self._pause(index + 1)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _stream(self, payload: dict) -> None:
+        """Stream tokens as SSE, NDJSON or plain text using chunked encoding."""
+        framing = (payload or {}).get("format", self.settings.stream_format)
+        content_type = {
+            "sse": "text/event-stream",
+            "ndjson": "application/x-ndjson",
+        }.get(framing, "text/plain; charset=utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i in range(self.settings.stream_tokens):
+            token = f"token{i} "
+            if framing == "sse":
+                data = f"data: {token}\n\n"
+            elif framing == "ndjson":
+                data = json.dumps({"token": token}) + "\n"
+            else:
+                data = token
+            self._send_chunk(data.encode())
+            self._pause(i + 1)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, settings: Optional[StubSettings] = None, background: bool = False):
+    """
+    Start a stub server.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind, 0 picks a free one
+        settings: Server behaviour, defaults to StubSettings()
+        background: Serve from a daemon thread and return immediately
+
+    Returns:
+        The server; its base url is f"http://{host}:{server.server_port}{prefix}"
+    """
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"settings": settings or StubSettings()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        print(f"harmonic stub server on http://{host}:{server.server_port}{handler.settings.prefix}")
+        server.serve_forever()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in harmonic server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--prefix", default="/harmonic")
+    parser.add_argument("--points", type=int, default=None, help="samples per series, default one per day of the query")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--stream-tokens", type=int, default=200)
+    parser.add_argument("--stream-format", choices=["sse", "ndjson", "text"], default="sse")
+    parser.add_argument("--no-compress", action="store_true")
+    parser.add_argument("--pause-every", type=int, default=0, help="stall streamed responses after this many charts or tokens")
+    parser.add_argument("--pause-ms", type=float, default=0.0, help="length of each stall")
+    args = parser.parse_args()
+    settings = StubSettings(
+        prefix=args.prefix,
+        points=args.points,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        stream_tokens=args.stream_tokens,
+        stream_format=args.stream_format,
+        compress=not args.no_compress,
+        pause_every=args.pause_every,
+        pause_ms=args.pause_ms
+    )
+    serve(args.host, args.port, settings)
+
+
+if __name__ == "__main__":
+    main()
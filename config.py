@@ -6,7 +6,7 @@ from typing import Dict, List, Optional
 from PySide6.QtCore import Qt
 from enum import Enum
 
-server_endpoint = "http://192.168.0.150/harmonic"
+server_endpoint = os.environ.get("HARMONIC_SERVER", "http://192.168.0.150/harmonic")
 
 class ColorScheme(Enum):
     DARK = "dark"
@@ -35,7 +35,6 @@ class ChartConfig:
     clip_to_view: bool = True
     color_palette: List[str] = None
     scatter_dot_size: int = 4 # New parameter for scatter dots
-    scatter_opacity: int = 120
     y_axis_units: str = None  # Default unit type for y-axis
     currency_symbol: str = '$'  # Default currency symbol
     value_label_position: float = 0.4  # Position as percentage of header width (0.0 to 1.0)
@@ -46,8 +45,7 @@ class ChartConfig:
     
     # Additional mouse-related settings
     scatter_pen: Optional[str] = None  # Pen for scatter points
-    scatter_brush_color: tuple = (255, 255, 255)  # White color for scatter points
-    scatter_px_mode: bool = True  # Use pixel mode for scatter points
+    hover_marker_z_value: int = 1000  # Keeps hover dots above the series lines
     
     # Viewport settings
     enable_x_mouse: bool = True  # Enable mouse interaction on x-axis
@@ -57,6 +55,8 @@ class ChartConfig:
     # Axis settings
     axis_z_value: int = -1000  # Z-index for axes
     axis_label_padding: int = 5  # Padding for axis labels
+    min_tick_spacing: int = 18  # Smallest distance in pixels between value axis ticks
+    date_tick_padding: int = 12  # Pixels kept free between date axis labels
     plot_margins: tuple = (5, 0, 5, 1)  # Plot margins (left, top, right, bottom)
 
     def __post_init__(self):
@@ -90,15 +90,51 @@ class TitleConfig:
 class PerformanceConfig:
     decimal_precision: int = 2
     ratelimit_mouse: int = 60
-    enable_cache: bool = True
+    enable_cache: bool = True  # Cache gestalt_get results client side
+    cache_max_bytes: int = 256 * 1024 * 1024  # Size of the in-memory LRU tier
+    cache_ttl_seconds: float = 48 * 3600  # Age after which cached results are refetched
+    cache_to_disk: bool = True  # Persist cached results across restarts
+    cache_dir: str = os.path.join(os.path.expanduser("~"), ".harmonic", "cache")
+    cache_max_disk_bytes: int = 2 * 1024 * 1024 * 1024  # Size of the disk tier; the oldest entries are swept beyond it
     cache_background: bool = True
+    series_store_max_bytes: int = 256 * 1024 * 1024  # Size of the LRU holding date ranges for gestalt_get_range
     smart_viewport_update: bool = False
     disable_antialiasing_optimization: bool = False
     viewport_anchor: str = "mouse"
     default_array_size: int = 100
-    downsampling_mode: str = "peak"
+    downsampling_mode: str = "peak"  # "peak" uses the min/max pyramid; "subsample" or "mean" use pyqtgraph
+    lod_min_points: int = 20_000  # Series shorter than this are drawn at full resolution
+    lod_factor: int = 4  # Samples merged per bucket between pyramid levels
+    live_window: int = 100_000  # Samples kept per series by HarmonicPlot.append_points
+    live_refresh_rate: int = 30  # Live curve redraws per second, however often points arrive
+    compact_storage: bool = False  # Store series as float32 and timestamps as int64 when within decimal_precision
+    quantize_values: bool = False  # With compact_storage, store series as scaled integers when they fit
+    virtualize_charts: bool = True  # Freeze or unload charts far outside the view
+    virtualize_margin: int = 400  # Viewport pixels around the view where charts stay live
+    virtualize_unload_distance: int = 3000  # Viewport pixels beyond which charts are unloaded
+    virtualize_interval: int = 50  # Milliseconds between visibility checks while panning
+    virtualize_swaps_per_check: int = 2  # Charts snapshotted or rebuilt per check; the rest wait for the next one
+    zoom_lod: bool = True  # Simplify charts as the canvas is zoomed out
+    zoom_sparkline_scale: float = 0.6  # View scale below which charts drop axes, grid, antialiasing and hover
+    zoom_thumbnail_scale: float = 0.4  # View scale below which charts are shown as static snapshots
     skip_finite_check: bool = True
 
+@dataclass
+class NetworkConfig:
+    pool_connections: int = 4  # Number of per-host connection pools to keep
+    pool_maxsize: int = 8  # Keep-alive connections held per host
+    connect_timeout: float = 3.05  # Seconds to establish a connection
+    read_timeout: float = 30.0  # Seconds to wait between bytes of a response
+    retry_total: int = 3  # Retries for idempotent GET requests
+    retry_backoff: float = 0.3  # Backoff factor between retries (0.3, 0.6, 1.2s...)
+    retry_statuses: tuple = (502, 503, 504)  # Status codes that trigger a retry
+    accept_encoding: Optional[str] = None  # e.g. "zstd, br, gzip"; None keeps the requests default
+    binary_columns: bool = True  # Ask for the binary column format, JSON remains the fallback
+    stream_chunk_size: int = 64 * 1024  # Largest read from a streaming response
+    stream_batch_items: int = 64  # Messages delivered to the UI per batch
+    stream_batch_interval: float = 0.05  # Seconds between partial batches
+    stream_max_pending_batches: int = 4  # Batches queued for the GUI before the reader waits
+
 @dataclass
 class CanvasBarConfig:
     height: int = 25
@@ -183,6 +219,7 @@ class HeaderConfig:
     label_width_ratio: float = 0.15  # Width as percentage of parent width
     label_height_ratio: float = 0.30  # Height as percentage of parent height
     max_columns: int = 2
+    painted_series_threshold: int = 12  # Charts with this many series get the painted header; 0 paints every header
     
     # Number formatting
     million_format: str = "{:.2f}M"
@@ -211,6 +248,9 @@ class ControllerConfig:
         }
     """
     placeholder_text: str = ""
+    max_fetch_threads: int = 4  # Thread pool size for background data fetches
+    batch_columns: int = 3  # Charts per row when a batch of charts is placed
+    batch_spacing: int = 20  # Gap between charts placed by a batch
     commands: List[str] = None
     context_label_style: str = """
         QLabel {
@@ -229,6 +269,26 @@ class ControllerConfig:
                 "/chat",
             ]
 
+@dataclass
+class PlaceholderConfig:
+    refresh_interval_ms: int = 100  # How often the elapsed time label is refreshed
+    progress_width_ratio: float = 0.4  # Progress bar width as percentage of placeholder width
+    error_color: str = "#ff5555"
+    style: str = """
+        QWidget {
+            background-color: #111111;
+            color: #c9d1d9;
+        }
+        QProgressBar {
+            border: 1px solid #3d3d3d;
+            border-radius: 2px;
+            max-height: 6px;
+        }
+        QProgressBar::chunk {
+            background-color: #3000b3;
+        }
+    """
+
 @dataclass
 class LoginConfig:
     width: int = 400
@@ -301,11 +361,13 @@ class GlobalConfig:
     enable_numba: bool = True
     default_window_size: tuple = (780, 420)
     performance: PerformanceConfig = None
+    network: NetworkConfig = None
     canvas_bar: CanvasBarConfig = None
     draggable: DraggableConfig = None
     header: HeaderConfig = None
     controller: ControllerConfig = None
     login: LoginConfig = None
+    placeholder: PlaceholderConfig = None
     
     def __post_init__(self):
         if self.font is None:
@@ -316,6 +378,8 @@ class GlobalConfig:
             self.title = TitleConfig()
         if self.performance is None:
             self.performance = PerformanceConfig()
+        if self.network is None:
+            self.network = NetworkConfig()
         if self.canvas_bar is None:
             self.canvas_bar = CanvasBarConfig()
         if self.draggable is None:
@@ -326,6 +390,8 @@ class GlobalConfig:
             self.controller = ControllerConfig()
         if self.login is None:
             self.login = LoginConfig()
+        if self.placeholder is None:
+            self.placeholder = PlaceholderConfig()
 
 # Create default configuration instance
 config = GlobalConfig()
\ No newline at end of file
@@ -0,0 +1,126 @@
+from PySide6.QtWidgets import QGraphicsView
+from PySide6.QtCore import QObject, QRectF, QTimer
+
+from scenes.infinite_canvas import InfiniteCanvas
+from config import config
+
+
+class ChartVirtualizer(QObject):
+    """
+    Keeps only the charts near the view of a QGraphicsView live.
+
+    Charts within virtualize_margin pixels of the viewport keep their
+    embedded widgets. Charts further out are frozen to a snapshot, and those
+    beyond virtualize_unload_distance are unloaded down to their payload.
+    Charts near the view also follow the zoom: below zoom_sparkline_scale
+    they drop to sparklines and below zoom_thumbnail_scale they are frozen
+    to thumbnails.
+    Checks are throttled to one per virtualize_interval while the view
+    scrolls and cost one rect test per chart; the slow swaps, snapshotting
+    a chart or rebuilding an unloaded one, are spread over several checks.
+    """
+
+    def __init__(self, view: QGraphicsView) -> None:
+        """
+        Watch a view for scrolling.
+
+        Args:
+            view: View showing an InfiniteCanvas; zooming, resizing and
+                scene switches should call schedule()
+        """
+        super().__init__(view)
+        self.view = view
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(config.performance.virtualize_interval)
+        self._timer.timeout.connect(self.update_residency)
+        view.horizontalScrollBar().valueChanged.connect(self.schedule)
+        view.verticalScrollBar().valueChanged.connect(self.schedule)
+
+    def schedule(self, *args) -> None:
+        """Run a check soon, at most once per interval."""
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _scene_rect(self, margin: float) -> QRectF:
+        """The viewport grown by margin pixels, in scene coordinates."""
+        rect = self.view.viewport().rect()
+        margin = int(margin)
+        return self.view.mapToScene(rect.adjusted(-margin, -margin, margin, margin)).boundingRect()
+
+    def zoom_tier(self) -> str:
+        """
+        Level of detail for the view's current scale.
+
+        Returns:
+            "full", "sparkline" or "thumbnail"
+        """
+        perf = config.performance
+        if not perf.zoom_lod:
+            return "full"
+        scale = self.view.transform().m11()
+        if scale < perf.zoom_thumbnail_scale:
+            return "thumbnail"
+        if scale < perf.zoom_sparkline_scale:
+            return "sparkline"
+        return "full"
+
+    def update_residency(self) -> None:
+        """Bring charts near the view to the zoom tier and freeze or unload the rest."""
+        canvas = self.view.scene()
+        if not isinstance(canvas, InfiniteCanvas):
+            return
+        perf = config.performance
+        tier = self.zoom_tier()
+        # Thumbnails are frozen sparklines
+        detail = "sparkline" if tier == "thumbnail" else tier
+        # Zoomed out this far a snapshot is never shown larger than the
+        # thumbnail threshold, so it is kept at that resolution in device pixels
+        scale = perf.zoom_thumbnail_scale * self.view.devicePixelRatioF() if tier == "thumbnail" else 1.0
+        margin = perf.virtualize_margin
+        live = self._scene_rect(margin)
+        # Charts between live and keep stay as they are, so panning back and
+        # forth across the margin does not keep freezing and thawing them
+        keep = self._scene_rect(margin * 1.5)
+        resident = self._scene_rect(max(perf.virtualize_unload_distance, margin * 1.5))
+        rebuild, freeze, thumbnails = [], [], set()
+        for window in canvas.selection:
+            rect = window.sceneBoundingRect()
+            if not perf.virtualize_charts or rect.intersects(live):
+                if window.residency == "unloaded":
+                    window.set_detail(detail)
+                    rebuild.append(window)
+                elif tier == "thumbnail":
+                    # Snapshots taken off-screen at another detail or scale
+                    # are retaken as thumbnails
+                    if window.residency == "live" or (window.snapshot_detail, window.snapshot_scale) != (detail, scale):
+                        thumbnails.add(window)
+                        freeze.append(window)
+                else:
+                    window.set_detail(detail)
+                    window.thaw()
+            elif not rect.intersects(resident):
+                # Live feeds cannot be unloaded; they are frozen within the budget
+                if not window.unload() and window.residency == "live":
+                    freeze.append(window)
+            elif not rect.intersects(keep) and window.residency == "live":
+                freeze.append(window)
+
+        # Rebuilding or snapshotting a chart takes tens of milliseconds, so
+        # only a few run per check, visible charts first, and the rest wait
+        # for the next check
+        visible = self._scene_rect(0)
+        offscreen = lambda window: not window.sceneBoundingRect().intersects(visible)
+        pending = sorted(rebuild, key=offscreen) + sorted(freeze, key=offscreen)
+        budget = perf.virtualize_swaps_per_check
+        for window in pending[:budget]:
+            if window.residency == "unloaded":
+                window.thaw()
+            elif window in thumbnails:
+                window.thaw()
+                window.set_detail(detail)
+                window.freeze(scale)
+            else:
+                window.freeze(scale)
+        if len(pending) > budget:
+            self.schedule()
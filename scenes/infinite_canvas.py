@@ -6,6 +6,8 @@ from models.asset_payload import AssetPayload  # Add this import
 
 from widgets.draggable_object import DraggableObject
 from widgets.harmonic_plot import HarmonicPlot
+from widgets.placeholder_object import PlaceholderObject
+from scenes.selection_manager import SelectionManager
 
 
 class InfiniteCanvas(QGraphicsScene):
@@ -20,6 +22,7 @@ class InfiniteCanvas(QGraphicsScene):
         """Initialize the infinite canvas with default charts."""
         super().__init__()
         self.setSceneRect(-10000, -10000, 20000, 20000)
+        self.selection = SelectionManager()
 
     def add_window(
         self,
@@ -29,10 +32,21 @@ class InfiniteCanvas(QGraphicsScene):
         """
         Create a new draggable window object with typed payload.
         """
-        window.clicked.connect(self.deselect_all)
+        self.selection.register(window)
         self.addItem(window)
         window.setPos(QPointF(*pos))
-        
+
+    def add_placeholder(
+        self,
+        placeholder: PlaceholderObject,
+        pos: tuple[float, float] = (-400, -150)
+    ) -> None:
+        """
+        Add a placeholder for a chart whose data is still loading.
+        """
+        self.addItem(placeholder)
+        placeholder.setPos(QPointF(*pos))
+
     def handle_wheel_event(self, event: QWheelEvent, view: QGraphicsProxyWidget) -> bool:
         """
         Handle mouse wheel events for zooming.
@@ -48,16 +62,33 @@ class InfiniteCanvas(QGraphicsScene):
         item = view.itemAt(int(pos.x()), int(pos.y()))
         
         if isinstance(item, QGraphicsProxyWidget):
-            if isinstance(item.widget(), HarmonicPlot):
+            # Sparklines have no axes to zoom, so the canvas zooms instead
+            if isinstance(item.widget(), HarmonicPlot) and not item.widget().sparkline:
                 return False
         
         factor = 1.1 if event.angleDelta().y() > 0 else 0.9
         view.scale(factor, factor)
         return True
 
+    def memory_report(self) -> Dict[str, object]:
+        """
+        Bytes held by the series data of every chart on the canvas.
+
+        Returns:
+            Per-chart totals keyed by title (suffixed when titles repeat) and
+            the canvas total
+        """
+        charts = {}
+        for item in self.selection:
+            if item.plot is not None:
+                name = item.title or "chart"
+                key, n = name, 1
+                while key in charts:
+                    n += 1
+                    key = f"{name} ({n})"
+                charts[key] = item.plot.memory_report()['total']
+        return {'charts': charts, 'total': sum(charts.values())}
+
     def deselect_all(self) -> None:
-        """Reset z-index and update all draggable objects."""
-        for item in self.items():
-            if isinstance(item, DraggableObject):
-                item.setZValue(0)
-                item.update()
+        """Clear the selected window's border and z-index."""
+        self.selection.clear()
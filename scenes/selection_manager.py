@@ -0,0 +1,95 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import Qt
+
+from widgets.draggable_object import DraggableObject
+
+
+class SelectionManager:
+    """
+    Registry of the draggable windows on a canvas and the one selected.
+
+    Selecting a window only repaints the borders of it and the previously
+    selected one. A window is raised above the rest only when it overlaps
+    another, since a z change repaints its header and plot as well, so
+    selection costs the same on a canvas of two charts or two hundred.
+    """
+
+    def __init__(self) -> None:
+        self.draggables: List[DraggableObject] = []
+        self.selected: Optional[DraggableObject] = None
+        self.raised: Optional[DraggableObject] = None
+        self._handlers: Dict[DraggableObject, Tuple[Callable[[], None], Callable[[], None]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.draggables)
+
+    def __iter__(self):
+        return iter(list(self.draggables))
+
+    def register(self, window: DraggableObject) -> None:
+        """Track a window, selecting it when clicked and raising it when dragged over another."""
+        if window in self._handlers:
+            return
+        on_click = lambda: self.select(window)
+        on_move = lambda: self.raise_if_covered(window)
+        self._handlers[window] = (on_click, on_move)
+        self.draggables.append(window)
+        window.clicked.connect(on_click)
+        window.moved.connect(on_move)
+        window.closed.connect(self.unregister)
+
+    def unregister(self, window: DraggableObject) -> None:
+        """Stop tracking a window, clearing the selection if it held it."""
+        handlers = self._handlers.pop(window, None)
+        if handlers is None:
+            return
+        self.draggables.remove(window)
+        window.clicked.disconnect(handlers[0])
+        window.moved.disconnect(handlers[1])
+        if self.selected is window:
+            self.selected = None
+        if self.raised is window:
+            self.raised = None
+
+    def select(self, window: Optional[DraggableObject]) -> None:
+        """
+        Make window the selected one, or clear the selection with None.
+
+        Args:
+            window: Window to select
+        """
+        previous = self.selected
+        if previous is window:
+            return
+        self.selected = window
+        # Raising first queues the z change's repaint ahead of the border
+        # strips, so both land in the same paint
+        if window is not None:
+            self.raise_if_covered(window)
+        if previous is not None:
+            previous.set_highlighted(False)
+        if window is not None:
+            window.set_highlighted(True)
+
+    def raise_if_covered(self, window: DraggableObject) -> None:
+        """
+        Put window above the others if it overlaps any of them.
+
+        Only one window is raised at a time; raising another lowers it.
+        """
+        if window is self.raised or window.scene() is None:
+            return
+        # The scene's index finds the items under the window without
+        # visiting every chart on the canvas
+        items = window.scene().items(window.sceneBoundingRect(), Qt.IntersectsItemBoundingRect)
+        if not any(isinstance(item, DraggableObject) and item is not window for item in items):
+            return
+        if self.raised is not None:
+            self.raised.setZValue(0)
+        window.setZValue(1)
+        self.raised = window
+
+    def clear(self) -> None:
+        """Deselect the selected window, if any."""
+        self.select(None)
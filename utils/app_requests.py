@@ -1,6 +1,19 @@
+import base64
+import json
+import threading
+import numpy as np
 import requests
-from config import server_endpoint
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import server_endpoint, config
 from pydantic import BaseModel
+from utils import wire_format
+from utils.stream_decoder import NDJSON, decode_stream, detect_framing
+from utils.cancel_scope import Cancelled, track_response
+from utils.query_cache import QueryCache, normalize_query, user_scope
+from utils.series_store import SeriesStore, fetch_range
+from utils.single_flight import SingleFlight
+from utils.transfer import accept_encoding_header, read_body
 
 class ConfigParams(BaseModel):
     config_name: str
@@ -12,39 +25,394 @@ class ConfigParams(BaseModel):
 class Token:
     token: str = None
 
-    
+
+def token_subject(token: str):
+    """Return the 'sub' claim of a JWT access token, unverified, or None."""
+    try:
+        claims = token.split(".")[1]
+        claims += "=" * (-len(claims) % 4)
+        return json.loads(base64.urlsafe_b64decode(claims)).get("sub")
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class SessionManager:
+    """
+    Shared keep-alive HTTP session for all calls to the harmonic server.
+
+    Holds a per-host connection pool so repeated queries reuse open
+    connections, retries idempotent GETs with backoff, and caches the
+    bearer-token headers and the user each token was issued to.
+    """
+
+    def __init__(self, network_config=None) -> None:
+        self.network_config = network_config or config.network
+        self._session = None
+        self._lock = threading.Lock()
+        self._headers = {}
+        self._users = {}
+
+    @property
+    def timeout(self) -> tuple:
+        """(connect, read) timeout pair passed to every request."""
+        return (self.network_config.connect_timeout, self.network_config.read_timeout)
+
+    @property
+    def session(self) -> requests.Session:
+        """Return the shared session, creating it on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> requests.Session:
+        retry = Retry(
+            total=self.network_config.retry_total,
+            backoff_factor=self.network_config.retry_backoff,
+            status_forcelist=self.network_config.retry_statuses,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.network_config.pool_connections,
+            pool_maxsize=self.network_config.pool_maxsize,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        # Lets a cancelled background job close the responses it is reading
+        session.hooks["response"].append(track_response)
+        return session
+
+    def headers(self, token: str) -> dict:
+        """Return the (cached) request headers for a bearer token."""
+        headers = self._headers.get(token)
+        if headers is None:
+            headers = {"Authorization":f"Bearer {token}",
+                       "Content-Type": "application/json"}
+            accept_encoding = accept_encoding_header(self.network_config.accept_encoding)
+            if accept_encoding:
+                headers["Accept-Encoding"] = accept_encoding
+            self._headers = {token: headers}  # Only the current token is kept
+        return headers
+
+    def set_user(self, token: str, username: str) -> None:
+        """Remember the user a token was issued to."""
+        self._users[token] = username
+
+    def user(self, token: str) -> str:
+        """
+        Stable identity behind a token, used to scope cached results.
+
+        Every login issues a new token, so caches are keyed on the user the
+        token was issued to: the username given at login, else the token's
+        subject claim, else the token itself.
+        """
+        user = self._users.get(token)
+        if user is None:
+            user = token_subject(token) or token
+            self._users[token] = user
+        return user
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+session_manager = SessionManager()
+query_cache = QueryCache(
+    max_bytes=config.performance.cache_max_bytes,
+    ttl=config.performance.cache_ttl_seconds,
+    cache_dir=config.performance.cache_dir if config.performance.cache_to_disk else None,
+    max_disk_bytes=config.performance.cache_max_disk_bytes
+)
+series_store = SeriesStore(
+    max_bytes=config.performance.series_store_max_bytes,
+    ttl=config.performance.cache_ttl_seconds
+)
+in_flight = SingleFlight()
+
+
+def decode_columns(response: requests.Response, body: bytes = None) -> tuple:
+    """
+    Decode a chart response into columns, negotiating on Content-Type.
+
+    Binary column blocks decode to read-only NumPy views over the body;
+    anything else is treated as a JSON list of columns.
+    """
+    body = response.content if body is None else body
+    content_type = response.headers.get("Content-Type", "")
+    if content_type.startswith(wire_format.MEDIA_TYPE):
+        return tuple(wire_format.decode_columns(body))
+    return tuple(np.asarray(column) for column in json.loads(body))
+
 def gestalt_get(token: str, payload):
-    headers = {"Authorization":f"Bearer {token}",
-               "Content-Type": "application/json"}
-    response = requests.get(server_endpoint+"/get", headers=headers, params=payload)
-    if response.status_code == 200:
-        response = response.json()
-        print(response[0],"\n", response[1])
-        return response[0], response[1] # x, y
+    user = session_manager.user(token)
+    if config.performance.enable_cache:
+        cached = query_cache.get(payload, user)
+        if cached is not None:
+            return cached
+    # Identical queries of the same user already on the wire share that
+    # request, scoped like the cache so no one is served another's result
+    key = (user_scope(user), normalize_query(payload))
+    return in_flight.do(key, _fetch_cached, token, payload)
+
+def _fetch_cached(token: str, payload):
+    columns = _fetch_columns(token, payload)
+    if columns is not None and config.performance.enable_cache:
+        columns = query_cache.put(payload, columns, session_manager.user(token))
+    return columns
+
+def _fetch_columns(token: str, payload):
+    headers = session_manager.headers(token)
+    if config.network.binary_columns:
+        headers = {**headers, "Accept": f"{wire_format.MEDIA_TYPE}, application/json;q=0.5"}
+    with session_manager.session.get(
+        server_endpoint+"/get",
+        headers=headers,
+        params=payload,
+        stream=True,
+        timeout=session_manager.timeout
+    ) as response:
+        if response.status_code != 200:
+            return None
+        body = read_body(response, config.network.stream_chunk_size)
+    return decode_columns(response, body) # x, y, ...
+
+def _series_query(payload) -> str:
+    return normalize_query({k: v for k, v in payload.items() if k not in ("startdate", "enddate")})
+
+def _invalidate_series(payload=None, **fields):
+    """Drop the held ranges of every series a query_cache.invalidate() call covers."""
+    if payload is not None:
+        query = _series_query(payload)
+        series_store.invalidate_where(lambda key: key[1] == query)
+    else:
+        series_store.invalidate_where(
+            lambda key: all(json.loads(key[1]).get(k) == v for k, v in fields.items())
+        )
+
+query_cache.listeners.append(_invalidate_series)
+
+def gestalt_get_range(token: str, payload):
+    """
+    Fetch a startdate/enddate query, requesting only days not already held.
+
+    Widening a range re-uses the previously fetched slice of the same series,
+    e.g. the same (config_name, brand), and merges the missing slices into it.
+    Fetched slices are held in memory only by series_store. The merged
+    result is also written to the query cache's disk tier under the
+    requested payload, so the same range opens without a fetch after a
+    restart.
+    """
+    if not config.performance.enable_cache or "startdate" not in payload or "enddate" not in payload:
+        return gestalt_get(token, payload)
+    user = session_manager.user(token)
+    scope = user_scope(user)
+    # Everything but the dates identifies the series, per user like the cache
+    key = (scope, _series_query(payload))
+    start, end = payload["startdate"], payload["enddate"]
+    if series_store.missing_ranges(key, start, end):
+        cached = query_cache.get(payload, user)
+        if cached is not None:
+            return cached
+    fetch = lambda sub_payload: in_flight.do(
+        (scope, normalize_query(sub_payload)), _fetch_columns, token, sub_payload
+    )
+    columns = fetch_range(series_store, key, payload, fetch)
+    if columns is not None and not query_cache.contains(payload, user):
+        query_cache.put(payload, columns, user, in_memory=False)
+    return columns
+
+def gestalt_batch(token: str, specs: list):
+    """
+    Fetch several charts in one round-trip via a batched gestalt_post.
+
+    Each spec goes through the same caches as a single chart: ranges already
+    held by series_store or queries in the query cache are served locally,
+    and startdate/enddate specs request only their missing days. Requests
+    already on the wire are waited for instead of sent again, and single
+    fetches issued meanwhile wait for this batch's part. The rest is sent in
+    a single request and each chart is yielded as soon as its parts of the
+    response have arrived.
+
+    Args:
+        token: Bearer token
+        specs: List of gestalt_get style query payloads
+
+    Yields:
+        (index into specs, columns) pairs, in arrival order
+    """
+    user = session_manager.user(token)
+    scope = user_scope(user)
+    caching = config.performance.enable_cache
+    ranged = lambda spec: caching and "startdate" in spec and "enddate" in spec
+    parts = []  # (spec index, request payload, in-flight key, call, leads the call)
+    pending = {}  # spec index -> parts not yet arrived
+    for index, spec in enumerate(specs):
+        requests_ = [spec]
+        if ranged(spec):
+            key = (scope, _series_query(spec))
+            missing = series_store.missing_ranges(key, spec["startdate"], spec["enddate"])
+            if not missing:
+                yield index, series_store.slice(key, spec["startdate"], spec["enddate"])
+                continue
+            requests_ = [{**spec, "startdate": str(lo), "enddate": str(hi)} for lo, hi in missing]
+        cached = query_cache.get(spec, user) if caching else None
+        if cached is not None:
+            yield index, cached
+            continue
+        pending[index] = len(requests_)
+        for request in requests_:
+            key = (scope, normalize_query(request))
+            parts.append((index, request, key, *in_flight.join(key)))
+
+    def arrived(index, request, columns):
+        """Fold one arrived part into its spec; return the spec's columns once complete."""
+        if index not in pending:
+            return None
+        spec = specs[index]
+        if columns is None:
+            del pending[index]
+            return None
+        if ranged(spec):
+            key = (scope, _series_query(spec))
+            series_store.merge(key, request["startdate"], request["enddate"], columns)
+            pending[index] -= 1
+            if pending[index]:
+                return None
+            columns = series_store.slice(key, spec["startdate"], spec["enddate"])
+            if not query_cache.contains(spec, user):
+                query_cache.put(spec, columns, user, in_memory=False)
+        del pending[index]
+        return tuple(columns)
+
+    led = [part for part in parts if part[4]]
+    try:
+        if led:
+            for position, columns in _post_batch(token, [part[1] for part in led]):
+                index, request, key, call, _ = led[position]
+                if caching and not ranged(specs[index]):
+                    columns = query_cache.put(request, columns, user)
+                # Range parts are shared raw, as gestalt_get_range shares them
+                in_flight.finish(key, call, columns)
+                columns = arrived(index, request, columns)
+                if columns is not None:
+                    yield index, columns
+        for index, request, key, call, leader in parts:
+            if not leader:
+                try:
+                    columns = in_flight.wait(call)
+                except Cancelled:
+                    # Whoever led the request was cancelled, so send it ourselves
+                    fetch = _fetch_columns if ranged(specs[index]) else _fetch_cached
+                    columns = in_flight.do(key, fetch, token, request)
+                columns = arrived(index, request, columns)
+                if columns is not None:
+                    yield index, columns
+    finally:
+        for _, _, key, call, _ in led:
+            if not call.done.is_set():
+                # Waiters retry with their own request
+                in_flight.finish(key, call, error=Cancelled("batch ended before this chart arrived"))
+
+def _post_batch(token: str, payloads: list):
+    """Send payloads as one batched gestalt_post and yield (position, columns) as they arrive."""
+    payload = ConfigParams(
+        config_name="batch",
+        batch=True,
+        charts=payloads
+    ).model_dump()
+    headers = session_manager.headers(token)
+    if config.network.binary_columns:
+        headers = {**headers, "Accept": f"{wire_format.BATCH_MEDIA_TYPE}, application/x-ndjson;q=0.5"}
+    with session_manager.session.post(
+        server_endpoint+"/post",
+        headers=headers,
+        json=payload,
+        stream=True,
+        timeout=session_manager.timeout
+    ) as response:
+        response.raise_for_status()
+        chunks = iter_raw_chunks(response, config.network.stream_chunk_size)
+        if response.headers.get("Content-Type", "").startswith(wire_format.BATCH_MEDIA_TYPE):
+            decoder = wire_format.FrameDecoder()
+            parts = (frame for chunk in chunks for frame in decoder.feed(chunk))
+        else:
+            # JSON fallback: one {"index": i, "columns": [...]} object per line
+            parts = (
+                (message["index"], tuple(np.asarray(column) for column in message["columns"]))
+                for message in decode_stream(chunks, NDJSON)
+            )
+        yield from parts
 
 def gestalt_post(token: str, payload: ConfigParams):
-    headers = {"Authorization":f"Bearer {token}",
-               "Content-Type": "application/json"}
-    response = requests.post(server_endpoint+"/post", headers=headers, json=payload)
+    response = session_manager.session.post(
+        server_endpoint+"/post",
+        headers=session_manager.headers(token),
+        json=payload,
+        timeout=session_manager.timeout
+    )
     return response.text
 
-def gestalt_post_stream(token, endpoint, payload=None):
-    headers = {"Authorization":f"Bearer {token}",
-               "Content-Type": "application/json"}
-    with requests.post(server_endpoint+endpoint, headers=headers, json=payload, stream=True) as response:
-        response.raise_for_status()
-        for chunk in response.iter_content(chunk_size=1, decode_unicode=True):
+def iter_raw_chunks(response: requests.Response, chunk_size: int):
+    """
+    Yield response bytes as soon as they arrive, up to chunk_size at a time.
+
+    read1 returns whatever is buffered instead of blocking until chunk_size
+    bytes are available, which keeps token streams responsive.
+    """
+    raw = response.raw
+    if hasattr(raw, "read1"):
+        while True:
+            chunk = raw.read1(chunk_size, decode_content=True)
+            if not chunk:
+                break
             yield chunk
+    else:
+        yield from response.iter_content(chunk_size=None)
+
+def gestalt_post_stream(token, endpoint, payload=None, framing=None):
+    """
+    Stream a response as complete messages.
+
+    The framing (NDJSON, SSE or plain text) is taken from the response
+    Content-Type unless given explicitly. Plain text yields decoded strings.
+    """
+    with session_manager.session.post(
+        server_endpoint+endpoint,
+        headers=session_manager.headers(token),
+        json=payload,
+        stream=True,
+        timeout=session_manager.timeout
+    ) as response:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "")
+        framing = framing or detect_framing(content_type)
+        # Streams are UTF-8 unless the server says otherwise (SSE always is)
+        encoding = response.encoding if "charset=" in content_type.lower() else "utf-8"
+        chunks = iter_raw_chunks(response, config.network.stream_chunk_size)
+        yield from decode_stream(chunks, framing, encoding)
 
 def login(username: str, password: str) -> str:
     data = {"username":username,
             "password":password}
     try:
-        response = requests.post(server_endpoint+"/token", data=data)
+        response = session_manager.session.post(
+            server_endpoint+"/token",
+            data=data,
+            timeout=session_manager.timeout
+        )
         if response.status_code == 200:
             token = Token()
             token_data = response.json()
             token.token = token_data.get("access_token")
+            session_manager.set_user(token.token, username)
         return token
     except:
-        return None 
\ No newline at end of file
+        return None
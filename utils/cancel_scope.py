@@ -0,0 +1,115 @@
+from typing import Iterable, Iterator, List, Optional
+import socket
+import threading
+
+_local = threading.local()
+
+
+class Cancelled(Exception):
+    """Raised for a request cut off because the job waiting for it was cancelled."""
+
+
+class CancelScope:
+    """
+    Tracks the HTTP responses opened on behalf of one background job.
+
+    While a scope is entered on a thread, every response the shared session
+    receives on that thread is attached to it. Cancelling the scope shuts
+    down the sockets of those responses, so a worker blocked reading one
+    returns at once and its pool thread and connection are freed, instead
+    of the request running to completion with its result thrown away.
+    """
+
+    def __init__(self) -> None:
+        self._responses: List = []
+        self._lock = threading.Lock()
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def attach(self, response) -> None:
+        """
+        Track a response so cancel() can close it.
+
+        Raises:
+            Cancelled: If the scope was cancelled before the response arrived
+        """
+        with self._lock:
+            if not self._cancelled:
+                self._responses.append(response)
+                return
+        abort(response)
+        raise Cancelled("request cancelled")
+
+    def cancel(self) -> None:
+        """Close every response attached so far and any attached later."""
+        with self._lock:
+            self._cancelled = True
+            responses, self._responses = self._responses, []
+        for response in responses:
+            abort(response)
+
+    def wrap(self, messages: Iterable) -> Iterator:
+        """
+        Iterate messages with the scope entered around each step.
+
+        For generators that open their response lazily, e.g. on the reader
+        thread of stream_decoder.batched rather than the job's own thread.
+        """
+        iterator = iter(messages)
+        try:
+            while True:
+                with self:
+                    try:
+                        message = next(iterator)
+                    except StopIteration:
+                        return
+                yield message
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    def __enter__(self) -> "CancelScope":
+        _stack().append(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _stack().pop()
+
+
+def _stack() -> List[CancelScope]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def current_scope() -> Optional[CancelScope]:
+    """The innermost scope entered on the calling thread, if any."""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def track_response(response, *args, **kwargs) -> None:
+    """requests response hook attaching each response to the current scope."""
+    scope = current_scope()
+    if scope is not None:
+        scope.attach(response)
+
+
+def abort(response) -> None:
+    """
+    Close a response from any thread.
+
+    Closing alone does not wake a thread blocked in a socket read, so the
+    socket is shut down first.
+    """
+    connection = getattr(response.raw, "connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    response.close()
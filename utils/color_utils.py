@@ -1,3 +1,8 @@
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+import random
+import numpy as np
+
 def get_relative_luminance(r, g, b):
     """Calculate relative luminance using sRGB."""
     def to_linear(c):
@@ -32,3 +37,135 @@ def get_contrast_color(background_color):
     black_contrast = get_contrast_ratio(background_color, "#000000")
     
     return "#000000" if black_contrast >= WCAG_AA_THRESHOLD else "#ffffff"
+
+# sRGB (D65) to CIE XYZ
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+def hex_to_rgb(colors: Iterable[str]) -> np.ndarray:
+    """Parse "#rrggbb" strings into an (n, 3) array of 0-255 values."""
+    return np.array([[int(c.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4)] for c in colors], dtype=np.float64).reshape(-1, 3)
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """
+    Convert sRGB colors to CIELAB.
+
+    Args:
+        rgb: Array of shape (n, 3) with 0-255 channel values
+
+    Returns:
+        Array of shape (n, 3) with L*, a*, b*
+    """
+    srgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ _RGB_TO_XYZ.T / _D65_WHITE
+    delta = 6 / 29
+    f = np.where(xyz > delta ** 3, np.cbrt(xyz), xyz / (3 * delta ** 2) + 4 / 29)
+    return np.stack([
+        116 * f[:, 1] - 16,
+        500 * (f[:, 0] - f[:, 1]),
+        200 * (f[:, 1] - f[:, 2]),
+    ], axis=1)
+
+def hex_to_lab(colors: Iterable[str]) -> np.ndarray:
+    """Parse "#rrggbb" strings straight into CIELAB."""
+    return rgb_to_lab(hex_to_rgb(colors))
+
+class PaletteIndex:
+    """
+    Assigns visually distinct colors from a fixed palette.
+
+    The palette is parsed once into CIELAB with a cached pairwise distance
+    matrix. A vector holding each entry's distance to the nearest color in
+    use is updated incrementally, so picking the next color is one argmax
+    over the palette instead of a palette x used-colors scan.
+    """
+
+    def __init__(self, palette: List[str]) -> None:
+        """
+        Build the index.
+
+        Args:
+            palette: Colors in "#rrggbb" format
+        """
+        self.palette = list(palette)
+        self._position = {color.lower(): i for i, color in enumerate(self.palette)}
+        self.lab = hex_to_lab(self.palette)
+        self.distances = np.linalg.norm(self.lab[:, None, :] - self.lab[None, :, :], axis=2)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every color in use."""
+        self.min_distance = np.full(len(self.palette), np.inf)
+        self.uses = np.zeros(len(self.palette), dtype=np.int64)
+
+    def fresh(self) -> "PaletteIndex":
+        """A new index over the same palette with nothing in use, sharing the parsed colors."""
+        index = object.__new__(PaletteIndex)
+        index.palette = self.palette
+        index._position = self._position
+        index.lab = self.lab
+        index.distances = self.distances
+        index.reset()
+        return index
+
+    def distances_to(self, color: str) -> np.ndarray:
+        """Distance from every palette entry to color, cached for palette members."""
+        i = self._position.get(color.lower())
+        if i is not None:
+            return self.distances[i]
+        return np.linalg.norm(self.lab - hex_to_lab([color]), axis=1)
+
+    def _use_index(self, i: int) -> None:
+        self.min_distance = np.minimum(self.min_distance, self.distances[i])
+        self.uses[i] += 1
+
+    def use(self, color: str) -> None:
+        """Mark color as in use; it does not have to be a palette member."""
+        i = self._position.get(color.lower())
+        if i is not None:
+            self._use_index(i)
+        else:
+            self.min_distance = np.minimum(self.min_distance, self.distances_to(color))
+
+    def release(self, color: str) -> None:
+        """Stop using one occurrence of a palette color."""
+        i = self._position.get(color.lower())
+        if i is None or self.uses[i] == 0:
+            return
+        self.uses[i] -= 1
+        used = self.uses > 0
+        self.min_distance = self.distances[:, used].min(axis=1) if used.any() else np.full(len(self.palette), np.inf)
+
+    def _furthest_index(self) -> int:
+        if np.isinf(self.min_distance).all():
+            return random.randrange(len(self.palette))
+        if self.min_distance.max() <= 0:
+            return int(np.argmin(self.uses))
+        return int(np.argmax(self.min_distance))
+
+    def furthest(self) -> Optional[str]:
+        """
+        The palette color furthest from every color in use.
+
+        A random color is returned while nothing is in use. Once every entry
+        is taken the least used one is returned, so colors repeat evenly.
+        """
+        return self.palette[self._furthest_index()] if self.palette else None
+
+    def take(self) -> Optional[str]:
+        """Pick the furthest color and mark it as in use."""
+        if not self.palette:
+            return None
+        i = self._furthest_index()
+        self._use_index(i)
+        return self.palette[i]
+
+@lru_cache(maxsize=8)
+def palette_index(palette: Tuple[str, ...]) -> PaletteIndex:
+    """Shared, read-only index for a palette, used for stateless lookups."""
+    return PaletteIndex(list(palette))
@@ -0,0 +1,122 @@
+from typing import Optional, Union
+import numpy as np
+
+_CODE_TYPES = (np.int8, np.int16, np.int32)
+
+
+def value_tolerance(precision: int) -> float:
+    """Largest storage error that is invisible at precision decimals."""
+    return 0.5 * 10.0 ** -precision
+
+
+class QuantizedArray:
+    """
+    Series stored as integer multiples of 10**-precision.
+
+    Codes are kept relative to their minimum in the smallest integer type
+    that holds the range, so a metric reported to two decimals between 0 and
+    300 takes two bytes per sample. Indexing decodes only the selected
+    samples to float64, which is all the hover and level-of-detail paths
+    read; np.asarray decodes the whole series.
+    """
+
+    def __init__(self, codes: np.ndarray, base: int, scale: float) -> None:
+        self.codes = codes
+        self.base = base
+        self.scale = scale
+        self.codes.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(np.float64)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes
+
+    def __getitem__(self, key) -> Union[float, np.ndarray]:
+        return (self.codes[key].astype(np.int64) + self.base) * self.scale
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        values = self[:]
+        return values if dtype is None else values.astype(dtype)
+
+
+def quantize(values: np.ndarray, precision: int) -> Optional[QuantizedArray]:
+    """
+    Quantize values to precision decimals.
+
+    Returns:
+        The quantized series, or None when values are not all finite or their
+        range does not fit in 32-bit codes
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0 or not np.isfinite(values).all():
+        return None
+    scale = 10.0 ** -precision
+    codes = np.rint(values / scale)
+    base = codes.min()
+    span = codes.max() - base
+    if abs(base) >= 2 ** 53:
+        return None
+    for code_type in _CODE_TYPES:
+        info = np.iinfo(code_type)
+        if span <= info.max - info.min:
+            return QuantizedArray((codes - base + info.min).astype(code_type), int(base) - int(info.min), scale)
+    return None
+
+
+def compact_values(
+    values: np.ndarray,
+    precision: int,
+    quantize_values: bool = False
+) -> Union[np.ndarray, QuantizedArray]:
+    """
+    Smallest representation of a series that stays within precision decimals.
+
+    Tries quantized integer codes when quantize_values is set, then float32,
+    and keeps float64 when neither meets value_tolerance(precision).
+
+    Args:
+        values: Series values
+        precision: Decimals that must survive, usually decimal_precision
+        quantize_values: Allow integer-coded storage
+
+    Returns:
+        A QuantizedArray, a float32 array or the input as float64
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        return values
+    values = values.astype(np.float64, copy=False)
+    if quantize_values:
+        quantized = quantize(values, precision)
+        if quantized is not None:
+            return quantized
+    narrow = values.astype(np.float32)
+    error = np.abs(narrow - values)
+    if len(values) == 0 or np.nanmax(error, initial=0.0) <= value_tolerance(precision):
+        return narrow
+    return values
+
+
+def compact_timestamps(values: np.ndarray) -> np.ndarray:
+    """
+    Epoch timestamps as int64 seconds when no sub-second part is lost.
+
+    Accepts datetime64 arrays or float seconds; anything else, or float
+    timestamps with fractions of a second, is returned unchanged.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[s]", copy=False).view(np.int64)
+    if values.dtype.kind == "f" and np.isfinite(values).all() and (values == np.floor(values)).all():
+        return values.astype(np.int64)
+    return values
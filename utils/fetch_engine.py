@@ -0,0 +1,223 @@
+from typing import Any, Callable, Dict, Hashable, Optional
+import itertools
+import threading
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+from config import config
+from utils.cancel_scope import CancelScope
+from utils.stream_decoder import batched
+
+
+class FetchJob(QRunnable):
+    """
+    A single background request run on the fetch engine's thread pool.
+
+    The job only ever reports back through the engine's signals, so all
+    widget construction happens on the GUI thread. Cancelling it shuts down
+    the responses it is reading, which frees its pool thread and connection
+    rather than letting the request run to completion.
+    """
+
+    def __init__(
+        self,
+        engine: "FetchEngine",
+        job_id: int,
+        fn: Callable,
+        args: tuple,
+        kwargs: dict
+    ) -> None:
+        super().__init__()
+        self.setAutoDelete(True)
+        self.engine = engine
+        self.job_id = job_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self._cancelled = threading.Event()
+        self.scope = CancelScope()
+
+    def cancel(self) -> None:
+        """Mark the job as cancelled and close the responses it is reading."""
+        self._cancelled.set()
+        self.scope.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self) -> None:
+        if self.cancelled:
+            return
+        try:
+            with self.scope:
+                result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.cancelled:
+                self.engine._job_failed.emit(self.job_id, str(e))
+            return
+        if not self.cancelled:
+            self.engine._job_finished.emit(self.job_id, result)
+
+
+class StreamJob(FetchJob):
+    """
+    A background job that consumes a message iterator and reports it in batches.
+
+    At most NetworkConfig.stream_max_pending_batches batches may wait for the
+    GUI thread; the reader blocks until they are delivered, which in turn
+    stops the socket from being read. Cancelling shuts down the response
+    being read, so the reader exits even while the server is silent.
+    """
+
+    def __init__(self, engine: "FetchEngine", job_id: int, fn: Callable, args: tuple, kwargs: dict) -> None:
+        super().__init__(engine, job_id, fn, args, kwargs)
+        self.slots = threading.Semaphore(config.network.stream_max_pending_batches)
+
+    def cancel(self) -> None:
+        super().cancel()
+        self.slots.release()  # Wake the reader if it is waiting on the GUI
+
+    def run(self) -> None:
+        if self.cancelled:
+            return
+        batches = None
+        try:
+            batches = batched(
+                # The messages are read on batched's own thread
+                self.scope.wrap(self.fn(*self.args, **self.kwargs)),
+                config.network.stream_batch_items,
+                config.network.stream_batch_interval
+            )
+            for batch in batches:
+                self.slots.acquire()
+                if self.cancelled:
+                    return
+                self.engine._stream_batch.emit(self.job_id, batch)
+        except Exception as e:
+            if not self.cancelled:
+                self.engine._job_failed.emit(self.job_id, str(e))
+            return
+        finally:
+            if batches is not None:
+                # batched closes the messages, which releases the connection
+                batches.close()
+            # The reader may still be blocked on a response that was never finished
+            self.scope.cancel()
+        if not self.cancelled:
+            self.engine._job_finished.emit(self.job_id, None)
+
+
+class FetchEngine(QObject):
+    """
+    Runs blocking server calls (gestalt_get, gestalt_post, ...) off the GUI thread.
+
+    Jobs are submitted under a key; submitting a new job with the same key
+    cancels the pending one so the newer query supersedes it.
+    """
+
+    started = Signal(int, object)  # job_id, key
+    finished = Signal(int, object)  # job_id, result
+    failed = Signal(int, str)  # job_id, error message
+    cancelled = Signal(int)  # job_id
+    stream_batch = Signal(int, object)  # job_id, messages
+
+    # Internal cross-thread signals, delivered queued onto the engine's thread
+    _job_finished = Signal(int, object)
+    _job_failed = Signal(int, str)
+    _stream_batch = Signal(int, object)
+
+    def __init__(self, max_threads: Optional[int] = None, parent=None) -> None:
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_threads:
+            self.pool.setMaxThreadCount(max_threads)
+        self._ids = itertools.count(1)
+        self._jobs: Dict[int, FetchJob] = {}
+        self._keys: Dict[int, Hashable] = {}
+        self._pending_by_key: Dict[Hashable, int] = {}
+        self._job_finished.connect(self._on_job_finished)
+        self._job_failed.connect(self._on_job_failed)
+        self._stream_batch.connect(self._on_stream_batch)
+
+    def submit(self, key: Hashable, fn: Callable, *args: Any, **kwargs: Any) -> int:
+        """
+        Queue a call on the thread pool.
+
+        Args:
+            key: Identity of the request; a pending job with the same key is cancelled
+            fn: Blocking callable to run in the background
+            *args, **kwargs: Arguments forwarded to fn
+
+        Returns:
+            Id of the submitted job
+        """
+        return self._start(FetchJob, key, fn, args, kwargs)
+
+    def submit_stream(self, key: Hashable, fn: Callable, *args: Any, **kwargs: Any) -> int:
+        """
+        Queue a streaming call whose messages are delivered through stream_batch.
+
+        Args:
+            key: Identity of the request; a pending job with the same key is cancelled
+            fn: Callable returning an iterator of messages, e.g. gestalt_post_stream
+            *args, **kwargs: Arguments forwarded to fn
+
+        Returns:
+            Id of the submitted job
+        """
+        return self._start(StreamJob, key, fn, args, kwargs)
+
+    def _start(self, job_type: type, key: Hashable, fn: Callable, args: tuple, kwargs: dict) -> int:
+        if key in self._pending_by_key:
+            self.cancel(self._pending_by_key[key])
+
+        job_id = next(self._ids)
+        job = job_type(self, job_id, fn, args, kwargs)
+        self._jobs[job_id] = job
+        self._keys[job_id] = key
+        self._pending_by_key[key] = job_id
+        self.started.emit(job_id, key)
+        self.pool.start(job)
+        return job_id
+
+    def cancel(self, job_id: int) -> None:
+        """Cancel a pending job. Its result, if any arrives, is dropped."""
+        job = self._release(job_id)
+        if job is None:
+            return
+        job.cancel()
+        self.cancelled.emit(job_id)
+
+    def cancel_all(self) -> None:
+        """Cancel every pending job."""
+        for job_id in list(self._jobs):
+            self.cancel(job_id)
+
+    def is_pending(self, job_id: int) -> bool:
+        return job_id in self._jobs
+
+    def _release(self, job_id: int) -> Optional[FetchJob]:
+        job = self._jobs.pop(job_id, None)
+        key = self._keys.pop(job_id, None)
+        if self._pending_by_key.get(key) == job_id:
+            del self._pending_by_key[key]
+        return job
+
+    @Slot(int, object)
+    def _on_job_finished(self, job_id: int, result: Any) -> None:
+        job = self._release(job_id)
+        if job is not None and not job.cancelled:
+            self.finished.emit(job_id, result)
+
+    @Slot(int, object)
+    def _on_stream_batch(self, job_id: int, batch: list) -> None:
+        job = self._jobs.get(job_id)
+        if job is None or job.cancelled:
+            return
+        self.stream_batch.emit(job_id, batch)
+        job.slots.release()
+
+    @Slot(int, str)
+    def _on_job_failed(self, job_id: int, error: str) -> None:
+        job = self._release(job_id)
+        if job is not None and not job.cancelled:
+            self.failed.emit(job_id, error)
@@ -0,0 +1,110 @@
+from typing import List, Optional, Tuple
+import math
+import numpy as np
+
+from utils.compact import QuantizedArray
+
+
+class MinMaxPyramid:
+    """
+    Precomputed min/max level-of-detail pyramid for one series.
+
+    levels[k] groups the samples into buckets of factor**(k + 1) and stores,
+    per bucket, the index of its smallest and largest sample; the raw samples
+    are the implicit level below levels[0]. Rendering a view
+    picks the level whose bucket count is closest to the pixel width and
+    returns the real extreme samples of each visible bucket, so peaks stay
+    exact while the work done per view change depends only on the number of
+    visible buckets.
+
+    x must be sorted ascending.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, factor: int = 4, min_buckets: int = 64) -> None:
+        """
+        Build the pyramid.
+
+        Args:
+            x: Sorted x values
+            y: Y values, same length as x
+            factor: Samples merged per bucket between consecutive levels
+            min_buckets: Stop adding levels once a level has fewer buckets
+        """
+        self.x = np.asarray(x)
+        # Quantized series are kept encoded and decoded per render
+        self.y = y if isinstance(y, QuantizedArray) else np.asarray(y)
+        self.factor = max(2, int(factor))
+        index_type = np.int32 if len(self.y) < 2 ** 31 else np.int64
+        self.levels: List[Tuple[np.ndarray, np.ndarray]] = []
+
+        n = len(self.y)
+        if n < self.factor:
+            return
+        # NaNs never win a bucket unless the whole bucket is NaN
+        values = np.asarray(self.y, dtype=np.float64)
+        low = np.where(np.isnan(values), np.inf, values)
+        high = np.where(np.isnan(values), -np.inf, values)
+        mins = maxs = np.arange(n, dtype=index_type)
+        while len(mins) >= self.factor and len(mins) // self.factor >= min_buckets:
+            mins = self._reduce(mins, low, np.argmin)
+            maxs = self._reduce(maxs, high, np.argmax)
+            self.levels.append((mins, maxs))
+
+    def _reduce(self, indices: np.ndarray, values: np.ndarray, pick) -> np.ndarray:
+        """Merge factor consecutive buckets, keeping the winning sample index."""
+        pad = -len(indices) % self.factor
+        if pad:
+            indices = np.concatenate([indices, np.repeat(indices[-1:], pad)])
+        groups = indices.reshape(-1, self.factor)
+        winners = pick(values[groups], axis=1)
+        return groups[np.arange(len(groups)), winners]
+
+    def nbytes(self) -> int:
+        """Memory held by the pyramid levels, excluding x and y."""
+        return sum(mins.nbytes + maxs.nbytes for mins, maxs in self.levels)
+
+    def render(self, x_min: float, x_max: float, pixels: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Samples to draw for a view.
+
+        Args:
+            x_min: Left edge of the view in data coordinates
+            x_max: Right edge of the view in data coordinates
+            pixels: Width of the view in device pixels
+
+        Returns:
+            x and y arrays covering the view plus one sample either side
+        """
+        n = len(self.y)
+        start = max(int(self.x.searchsorted(x_min)) - 1, 0)
+        stop = min(int(self.x.searchsorted(x_max, side="right")) + 1, n)
+        if stop <= start:
+            return self.x[:0], self.y[:0]
+
+        level = self.level_for(stop - start, pixels)
+        if level is None:
+            return self.x[start:stop], self.y[start:stop]
+
+        mins, maxs = self.levels[level]
+        size = self.factor ** (level + 1)
+        first, last = start // size, min(-(-stop // size), len(mins))
+        lo, hi = mins[first:last], maxs[first:last]
+        # Emit each bucket's extremes in x order so the line stays monotonic
+        indices = np.empty(2 * len(lo), dtype=lo.dtype)
+        indices[0::2] = np.minimum(lo, hi)
+        indices[1::2] = np.maximum(lo, hi)
+        return self.x[indices], self.y[indices]
+
+    def level_for(self, samples: int, pixels: int) -> Optional[int]:
+        """
+        Coarsest level that still has at least one bucket per pixel.
+
+        Returns:
+            Index into levels, or None to draw the raw samples
+        """
+        if pixels <= 0 or samples <= 2 * pixels or not self.levels:
+            return None
+        level = int(math.log(samples / pixels, self.factor)) - 1
+        if level < 0:
+            return None
+        return min(level, len(self.levels) - 1)
@@ -0,0 +1,314 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import numpy as np
+
+
+def normalize_query(payload: Dict[str, Any]) -> str:
+    """
+    Return a canonical string for a query payload.
+
+    Key order and JSON spacing do not matter, so equivalent queries share a key.
+    """
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def user_scope(user: Optional[str]) -> str:
+    """
+    Return a digest identifying whose results an entry holds.
+
+    user should be stable across logins, e.g. the username, so entries
+    written in one session are found in the next. Only the digest is kept
+    in keys and on disk.
+    """
+    return hashlib.sha1((user or "").encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """
+    Client-side cache for gestalt_get results keyed on the normalized payload
+    and the user, so users never share entries.
+
+    Results live in a byte-bounded in-memory LRU tier and, when a cache
+    directory is given, in an on-disk tier of .npy files that are memory-mapped
+    back in after a restart. Entries older than ttl seconds are ignored. The
+    disk tier is swept on startup and whenever it outgrows max_disk_bytes:
+    expired entries go first, then the oldest.
+    Callables appended to listeners are called with the arguments of every
+    invalidate(), so stores derived from cached results can drop theirs too.
+    """
+
+    META_FILE = "meta.json"
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: Optional[float] = None,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: Optional[int] = None
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound on the bytes held by the memory tier
+            ttl: Seconds an entry stays valid, None to never expire
+            cache_dir: Directory of the disk tier, None to keep results in memory only
+            max_disk_bytes: Upper bound on the bytes held by the disk tier, None for no bound
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.current_bytes = 0
+        self.disk_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict, Tuple[np.ndarray, ...], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self.listeners: List[Callable[..., None]] = []
+        if cache_dir:
+            self.sweep()
+
+    @staticmethod
+    def _key(query: str, user: Optional[str] = None) -> str:
+        return hashlib.sha1(f"{user_scope(user)}\n{query}".encode("utf-8")).hexdigest()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, payload: Dict[str, Any], user: Optional[str] = None) -> Optional[Tuple[np.ndarray, ...]]:
+        """
+        Look up a cached result.
+
+        Args:
+            payload: Query payload as passed to gestalt_get
+            user: Identity of the user the result was fetched for
+
+        Returns:
+            Tuple of read-only column arrays, or None on a miss
+        """
+        key = self._key(normalize_query(payload), user)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._entries.move_to_end(key)
+                    return entry[2]
+                self._remove(key)
+
+        loaded = self._load(key)
+        if loaded is None:
+            return None
+        created, columns = loaded
+        self._store(key, created, payload, columns)
+        return columns
+
+    def contains(self, payload: Dict[str, Any], user: Optional[str] = None) -> bool:
+        """Whether either tier holds an entry for the query, without loading it."""
+        key = self._key(normalize_query(payload), user)
+        with self._lock:
+            if key in self._entries:
+                return True
+        return bool(self.cache_dir) and os.path.isdir(os.path.join(self.cache_dir, key))
+
+    def put(
+        self,
+        payload: Dict[str, Any],
+        columns: Sequence[np.ndarray],
+        user: Optional[str] = None,
+        in_memory: bool = True
+    ) -> Tuple[np.ndarray, ...]:
+        """
+        Cache a result in memory and, if enabled, on disk.
+
+        Args:
+            payload: Query payload as passed to gestalt_get
+            columns: Result columns
+            user: Identity of the user the result was fetched for
+            in_memory: False to only write the disk tier, for results the
+                caller already holds in memory elsewhere
+
+        Returns:
+            The columns as cached, marked read-only since they are shared
+        """
+        columns = tuple(np.asarray(column) for column in columns)
+        for column in columns:
+            column.flags.writeable = False
+        key = self._key(normalize_query(payload), user)
+        created = time.time()
+        if in_memory:
+            self._store(key, created, payload, columns)
+        self._save(key, created, payload, columns)
+        return columns
+
+    def invalidate(self, payload: Optional[Dict[str, Any]] = None, **fields: Any) -> int:
+        """
+        Drop cached entries from both tiers.
+
+        Args:
+            payload: Exact query to drop, for every user
+            **fields: Drop every query whose payload contains these values,
+                e.g. invalidate(config_name="revenue"). With neither argument
+                the whole cache is cleared.
+
+        Returns:
+            Number of entries removed
+        """
+        if payload is not None:
+            query = normalize_query(payload)
+            keys = {key for key, held in self._queries() if normalize_query(held) == query}
+        else:
+            keys = {key for key, held in self._queries() if all(held.get(k) == v for k, v in fields.items())}
+
+        removed = set()
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+                    removed.add(key)
+        if self.cache_dir:
+            for key in keys:
+                if self._delete(key):
+                    removed.add(key)
+        for listener in self.listeners:
+            listener(payload, **fields)
+        return len(removed)
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        self.invalidate()
+
+    def sweep(self) -> int:
+        """
+        Trim the disk tier.
+
+        Deletes expired entries and entries without readable metadata, then
+        the oldest entries until the tier fits max_disk_bytes.
+
+        Returns:
+            Number of entries deleted
+        """
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return 0
+        with self._disk_lock:
+            return self._sweep()
+
+    def _sweep(self) -> int:
+        deleted = 0
+        kept = []
+        for key in os.listdir(self.cache_dir):
+            if key.startswith("."):
+                continue
+            meta = self._read_meta(key)
+            if meta is None or self._expired(meta["created"]):
+                deleted += self._delete(key)
+            else:
+                kept.append((meta["created"], key, self._disk_size(key)))
+        kept.sort()
+        total = sum(size for _, _, size in kept)
+        for _, key, size in kept:
+            if self.max_disk_bytes is None or total <= self.max_disk_bytes:
+                break
+            deleted += self._delete(key)
+            total -= size
+        self.disk_bytes = total
+        return deleted
+
+    def _disk_size(self, key: str) -> int:
+        path = os.path.join(self.cache_dir, key)
+        try:
+            return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+        except OSError:
+            return 0
+
+    def _delete(self, key: str) -> bool:
+        """Delete a disk entry, returning whether there was one."""
+        path = os.path.join(self.cache_dir, key)
+        if not os.path.isdir(path):
+            return False
+        shutil.rmtree(path, ignore_errors=True)
+        return True
+
+    def _queries(self):
+        """Yield (key, payload) for every entry in either tier."""
+        with self._lock:
+            seen = [(key, entry[1]) for key, entry in self._entries.items()]
+        yield from seen
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            keys = {key for key, _ in seen}
+            for key in os.listdir(self.cache_dir):
+                if key in keys or key.startswith("."):
+                    continue
+                meta = self._read_meta(key)
+                if meta is not None:
+                    yield key, meta["query"]
+
+    def _store(self, key: str, created: float, payload: Dict, columns: Tuple[np.ndarray, ...]) -> None:
+        nbytes = sum(column.nbytes for column in columns)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (created, payload, columns, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        self.current_bytes -= self._entries.pop(key)[3]
+
+    def _read_meta(self, key: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self.cache_dir, key, self.META_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load(self, key: str) -> Optional[Tuple[float, Tuple[np.ndarray, ...]]]:
+        if not self.cache_dir:
+            return None
+        meta = self._read_meta(key)
+        if meta is None:
+            return None
+        if self._expired(meta["created"]):
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            return None
+        try:
+            columns = tuple(
+                np.load(os.path.join(self.cache_dir, key, f"col_{i}.npy"), mmap_mode="r")
+                for i in range(meta["columns"])
+            )
+        except (OSError, ValueError):
+            return None
+        return meta["created"], columns
+
+    def _save(self, key: str, created: float, payload: Dict, columns: Tuple[np.ndarray, ...]) -> None:
+        if not self.cache_dir or any(column.dtype.hasobject for column in columns):
+            return
+        staging = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            staging = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+            for i, column in enumerate(columns):
+                np.save(os.path.join(staging, f"col_{i}.npy"), column)
+            with open(os.path.join(staging, self.META_FILE), "w") as f:
+                json.dump({"created": created, "query": payload, "columns": len(columns)}, f, default=str)
+            target = os.path.join(self.cache_dir, key)
+            with self._disk_lock:
+                self.disk_bytes -= self._disk_size(key)
+                shutil.rmtree(target, ignore_errors=True)
+                os.replace(staging, target)
+                self.disk_bytes += self._disk_size(key)
+        except OSError:
+            if staging:
+                shutil.rmtree(staging, ignore_errors=True)
+            return
+        if self.max_disk_bytes is not None and self.disk_bytes > self.max_disk_bytes:
+            self.sweep()
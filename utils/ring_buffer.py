@@ -0,0 +1,137 @@
+from typing import Optional
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-window column store for live series.
+
+    Rows are columns of the data (x first, then one row per series) and all
+    rows share one head, so appending a sample to x and every series is a
+    single write. The buffer grows geometrically until it reaches window
+    samples and then overwrites the oldest ones.
+
+    Every sample is written twice, at p and p + capacity, so the live window
+    is always one contiguous slice and view() never copies.
+    """
+
+    def __init__(
+        self,
+        rows: int,
+        window: int,
+        initial_capacity: int = 1024,
+        dtype=np.float64
+    ) -> None:
+        """
+        Allocate the buffer.
+
+        Args:
+            rows: Number of columns stored side by side
+            window: Maximum number of samples kept
+            initial_capacity: Samples allocated up front, grown up to window
+            dtype: Element type of every row
+        """
+        self.window = max(1, int(window))
+        self.capacity = min(max(1, int(initial_capacity)), self.window)
+        self._data = np.full((rows, 2 * self.capacity), np.nan, dtype=dtype)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def rows(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def _grow(self, needed: int) -> None:
+        """Reallocate to hold needed samples, capped at window."""
+        capacity = min(self.window, max(2 * self.capacity, needed))
+        data = np.full((self.rows, 2 * capacity), np.nan, dtype=self._data.dtype)
+        live = self.view()
+        data[:, :self._size] = live
+        data[:, capacity:capacity + self._size] = live
+        self._data = data
+        self.capacity = capacity
+        self._start = 0
+
+    def add_row(self, fill: float = np.nan) -> int:
+        """
+        Append a row, e.g. for a series added after streaming started.
+
+        Returns:
+            Index of the new row
+        """
+        row = np.full((1, self._data.shape[1]), fill, dtype=self._data.dtype)
+        self._data = np.vstack([self._data, row])
+        return self.rows - 1
+
+    def set_row(self, row: int, values: np.ndarray) -> None:
+        """
+        Overwrite the newest samples of one row.
+
+        Args:
+            row: Row to write
+            values: Values aligned to the end of the live window
+        """
+        values = np.asarray(values, dtype=self._data.dtype)
+        values = values[max(len(values) - self._size, 0):]
+        k = len(values)
+        positions = (self._start + self._size - k + np.arange(k)) % self.capacity
+        self._data[row, positions] = values
+        self._data[row, positions + self.capacity] = values
+
+    def append(self, block: np.ndarray) -> bool:
+        """
+        Append samples to every row.
+
+        Args:
+            block: Array of shape (rows, k); only the last window samples are kept
+
+        Returns:
+            Whether earlier samples were dropped or reallocated, which leaves
+            views taken before the call pointing at stale data
+        """
+        block = np.asarray(block, dtype=self._data.dtype)
+        if block.ndim == 1:
+            block = block[:, None]
+        k = block.shape[1]
+        if k == 0:
+            return False
+        if k > self.window:
+            block = block[:, -self.window:]
+            k = self.window
+        grown = self._size + k > self.capacity and self.capacity < self.window
+        if grown:
+            self._grow(self._size + k)
+
+        capacity = self.capacity
+        end = self._start + self._size
+        positions = (end + np.arange(k)) % capacity
+        self._data[:, positions] = block
+        self._data[:, positions + capacity] = block
+
+        overflow = self._size + k - capacity
+        if overflow > 0:
+            self._start = (self._start + overflow) % capacity
+            self._size = capacity
+        else:
+            self._size += k
+        return grown or overflow > 0
+
+    def view(self, row: Optional[int] = None) -> np.ndarray:
+        """
+        The live window without copying.
+
+        Args:
+            row: A single row to return, or None for all rows
+
+        Returns:
+            Array of shape (size,) or (rows, size), oldest sample first
+        """
+        window = self._data[:, self._start:self._start + self._size]
+        return window if row is None else window[row]
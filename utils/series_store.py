@@ -0,0 +1,226 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+import threading
+import time
+import numpy as np
+
+DAY = np.timedelta64(1, "D")
+
+
+def to_day(value) -> np.datetime64:
+    """Convert a 'YYYY-MM-DD' string or datetime-like value to a day."""
+    return np.datetime64(value, "D")
+
+
+def x_to_days(x: np.ndarray) -> np.ndarray:
+    """
+    Convert x values to days for range bookkeeping.
+
+    Date strings and datetime64 values are parsed directly; numbers are taken
+    to be epoch seconds, as produced by the chart builders.
+    """
+    x = np.asarray(x)
+    if x.dtype.kind in "USM":
+        return x.astype("datetime64[D]")
+    return x.astype(np.int64).astype("datetime64[s]").astype("datetime64[D]")
+
+
+class SeriesStore:
+    """
+    Remembers which date ranges of a series are already held client side.
+
+    Each series is identified by a key such as (config_name, brand). The store
+    keeps the covered day intervals and the merged, sorted columns, so that a
+    wider query only needs the missing sub-ranges from the server.
+
+    Series are held in a byte-bounded LRU, and a series first fetched more
+    than ttl seconds ago is dropped and fetched again as a whole.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            max_bytes: Upper bound on the bytes held, None for no bound. The
+                series merged last is always kept, even if larger.
+            ttl: Seconds a series stays valid, None to never expire
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self._intervals: Dict[Hashable, List[Tuple[np.datetime64, np.datetime64]]] = {}
+        self._columns: "OrderedDict[Hashable, Tuple[np.ndarray, ...]]" = OrderedDict()
+        self._created: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def missing_ranges(self, key: Hashable, start, end) -> List[Tuple[np.datetime64, np.datetime64]]:
+        """
+        Return the inclusive day ranges in [start, end] not yet held for key.
+
+        Args:
+            key: Series identifier
+            start: First day of the query
+            end: Last day of the query
+
+        Returns:
+            List of (start, end) day pairs, in order
+        """
+        start, end = to_day(start), to_day(end)
+        missing = []
+        cursor = start
+        with self._lock:
+            created = self._created.get(key)
+            if created is not None and self.ttl is not None and time.time() - created > self.ttl:
+                self._forget(key)
+            intervals = list(self._intervals.get(key, []))
+        for lo, hi in intervals:
+            if hi < cursor:
+                continue
+            if lo > end:
+                break
+            if lo > cursor:
+                missing.append((cursor, lo - DAY))
+            cursor = max(cursor, hi + DAY)
+            if cursor > end:
+                break
+        if cursor <= end:
+            missing.append((cursor, end))
+        return missing
+
+    def merge(self, key: Hashable, start, end, columns: Sequence[np.ndarray]) -> None:
+        """
+        Merge a fetched slice covering [start, end] into the stored series.
+
+        Rows are kept sorted by x; when both old and new data hold the same x,
+        the newly fetched row wins.
+
+        Args:
+            key: Series identifier
+            start: First day the slice covers
+            end: Last day the slice covers
+            columns: Fetched (x, y, ...) columns
+        """
+        start, end = to_day(start), to_day(end)
+        columns = tuple(np.asarray(column) for column in columns)
+        if not columns:
+            return
+        with self._lock:
+            held = self._columns.get(key)
+            intervals = self._intervals.get(key, [])
+            if held is not None and len(held) != len(columns):
+                intervals = []  # Shape of the series changed, start over
+            elif held is not None and len(held[0]):
+                columns = tuple(np.concatenate([old, new]) for old, new in zip(held, columns))
+            if len(columns[0]):
+                order = np.argsort(columns[0], kind="stable")
+                columns = tuple(column[order] for column in columns)
+                x = columns[0]
+                # Of equal x values the last one came from the newest fetch
+                keep = np.ones(len(x), dtype=bool)
+                keep[:-1] = x[1:] != x[:-1]
+                columns = tuple(column[keep] for column in columns)
+            if key in self._columns:
+                self.current_bytes -= _nbytes(self._columns.pop(key))
+            self._columns[key] = columns
+            self.current_bytes += _nbytes(columns)
+            self._intervals[key] = self._add_interval(intervals, start, end)
+            self._created.setdefault(key, time.time())
+            if self.max_bytes is not None:
+                while self.current_bytes > self.max_bytes and len(self._columns) > 1:
+                    self._forget(next(iter(self._columns)))
+
+    def slice(self, key: Hashable, start, end) -> Optional[Tuple[np.ndarray, ...]]:
+        """
+        Return the stored rows with x between start and end, inclusive.
+
+        Args:
+            key: Series identifier
+            start: First day
+            end: Last day
+
+        Returns:
+            Tuple of columns, or None if nothing is held for key
+        """
+        with self._lock:
+            columns = self._columns.get(key)
+            if columns is None:
+                return None
+            self._columns.move_to_end(key)
+        days = x_to_days(columns[0])
+        lo = np.searchsorted(days, to_day(start), side="left")
+        hi = np.searchsorted(days, to_day(end), side="right")
+        return tuple(column[lo:hi] for column in columns)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Forget one series, or every series when key is None."""
+        with self._lock:
+            keys = list(self._intervals) if key is None else [key]
+            for key in keys:
+                self._forget(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Forget every series whose key matches.
+
+        Args:
+            predicate: Called with each series key
+
+        Returns:
+            Number of series forgotten
+        """
+        with self._lock:
+            keys = [key for key in self._intervals if predicate(key)]
+            for key in keys:
+                self._forget(key)
+        return len(keys)
+
+    def _forget(self, key: Hashable) -> None:
+        columns = self._columns.pop(key, None)
+        if columns is not None:
+            self.current_bytes -= _nbytes(columns)
+        self._intervals.pop(key, None)
+        self._created.pop(key, None)
+
+    @staticmethod
+    def _add_interval(intervals, start, end):
+        """Insert [start, end] and merge overlapping or adjacent intervals."""
+        merged = []
+        for lo, hi in sorted(intervals + [(start, end)]):
+            if merged and lo <= merged[-1][1] + DAY:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+            else:
+                merged.append((lo, hi))
+        return merged
+
+
+def _nbytes(columns: Tuple[np.ndarray, ...]) -> int:
+    return sum(column.nbytes for column in columns)
+
+
+def fetch_range(
+    store: SeriesStore,
+    key: Hashable,
+    payload: Dict,
+    fetch: Callable[[Dict], Optional[Sequence[np.ndarray]]]
+) -> Optional[Tuple[np.ndarray, ...]]:
+    """
+    Serve a startdate/enddate query, fetching only the days not yet held.
+
+    Args:
+        store: Store holding previously fetched slices
+        key: Series identifier
+        payload: Query with 'startdate' and 'enddate' entries
+        fetch: Function performing the actual request for a payload
+
+    Returns:
+        Columns covering the requested range, or None if a fetch failed
+    """
+    start, end = payload["startdate"], payload["enddate"]
+    for lo, hi in store.missing_ranges(key, start, end):
+        sub_payload = {**payload, "startdate": str(lo), "enddate": str(hi)}
+        columns = fetch(sub_payload)
+        if columns is None:
+            return None
+        store.merge(key, lo, hi, columns)
+    return store.slice(key, start, end)
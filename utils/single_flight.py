@@ -0,0 +1,115 @@
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import threading
+
+from utils.cancel_scope import Cancelled, current_scope
+
+
+class _Call:
+    """State of one in-flight call shared by all of its waiters."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent calls into a single execution.
+
+    The first caller for a key runs the function; callers arriving with the
+    same key while it is still running wait for and share its result (or
+    exception) instead of issuing their own request. If the first caller's
+    job is cancelled, the waiters run the call again rather than fail.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.deduplicated = 0
+
+    def do(self, key: Hashable, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run fn, or join an identical call that is already in flight.
+
+        Args:
+            key: Identity of the call, e.g. the normalized request payload
+            fn: Function to run
+            *args, **kwargs: Arguments forwarded to fn
+
+        Returns:
+            The result of the shared call
+        """
+        call, leader = self.join(key)
+        if not leader:
+            try:
+                return self.wait(call)
+            except Cancelled:
+                scope = current_scope()
+                if scope is not None and scope.cancelled:
+                    raise
+                return self.do(key, fn, *args, **kwargs)
+
+        result = error = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        except Exception as e:
+            scope = current_scope()
+            # Waiters must not fail because this caller's job was cancelled
+            error = Cancelled("request cancelled") if scope is not None and scope.cancelled else e
+            raise
+        finally:
+            self.finish(key, call, result, error)
+
+    def join(self, key: Hashable) -> Tuple[_Call, bool]:
+        """
+        Register a call for key without running anything.
+
+        For callers that produce several results from one request, such as
+        a batch; the leader must finish() the call, followers wait() on it.
+
+        Returns:
+            (call, whether the caller leads it)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.deduplicated += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self.executed += 1
+            return call, True
+
+    def finish(self, key: Hashable, call: _Call, result: Any = None, error: Optional[Exception] = None) -> None:
+        """Publish the result (or exception) of a led call and release its waiters."""
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    @staticmethod
+    def wait(call: _Call) -> Any:
+        """Block until a joined call finishes and return its result."""
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for executed and deduplicated calls."""
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "deduplicated": self.deduplicated,
+                "in_flight": len(self._calls)
+            }
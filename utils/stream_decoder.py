@@ -0,0 +1,206 @@
+from typing import Any, Iterable, Iterator, List, Optional
+import codecs
+import json
+import queue
+import threading
+import time
+
+NDJSON = "ndjson"
+SSE = "sse"
+TEXT = "text"
+
+_NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+_SSE_TYPES = ("text/event-stream",)
+
+# Tags of the items batched's reader thread hands over
+_MESSAGE, _END, _ERROR = object(), object(), object()
+
+
+def detect_framing(content_type: Optional[str]) -> str:
+    """
+    Choose a framing from a response Content-Type.
+
+    Args:
+        content_type: Value of the Content-Type header
+
+    Returns:
+        One of NDJSON, SSE or TEXT
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in _NDJSON_TYPES:
+        return NDJSON
+    if content_type in _SSE_TYPES:
+        return SSE
+    return TEXT
+
+
+class StreamDecoder:
+    """
+    Incremental decoder turning arbitrary byte chunks into complete messages.
+
+    NDJSON yields one parsed object per line, SSE yields the joined ``data:``
+    payload of each event and TEXT yields decoded text as it arrives.
+    """
+
+    def __init__(self, framing: str = TEXT, encoding: str = "utf-8") -> None:
+        if framing not in (NDJSON, SSE, TEXT):
+            raise ValueError(f"unknown framing {framing!r}")
+        self.framing = framing
+        self.encoding = encoding
+        self._text_decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._buffer = bytearray()
+        self._event_data: List[str] = []
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Consume a chunk and return the messages it completes.
+
+        Args:
+            chunk: Raw bytes read from the response
+
+        Returns:
+            List of complete messages, possibly empty
+        """
+        if self.framing == TEXT:
+            text = self._text_decoder.decode(chunk)
+            return [text] if text else []
+
+        self._buffer += chunk
+        end = self._buffer.rfind(b"\n")
+        if end < 0:
+            return []
+        lines = self._buffer[:end].split(b"\n")
+        del self._buffer[:end + 1]
+        return self._frame_lines(lines)
+
+    def flush(self) -> List[Any]:
+        """Return any message left over once the stream has ended."""
+        if self.framing == TEXT:
+            text = self._text_decoder.decode(b"", final=True)
+            return [text] if text else []
+
+        lines = self._buffer.split(b"\n") if self._buffer else []
+        self._buffer.clear()
+        if self.framing == SSE:
+            # Only a blank line dispatches an event; one cut off by the end of
+            # the stream is incomplete and dropped, as the SSE spec requires
+            self._event_data = []
+            return []
+        return self._frame_lines(lines)
+
+    def _frame_lines(self, lines: List[bytearray]) -> List[Any]:
+        if self.framing == NDJSON:
+            return [json.loads(line) for line in lines if line.strip()]
+
+        messages = []
+        for raw_line in lines:
+            line = raw_line.rstrip(b"\r").decode(self.encoding, errors="replace")
+            if not line:
+                # A blank line dispatches the event
+                if self._event_data:
+                    messages.append("\n".join(self._event_data))
+                    self._event_data = []
+            elif line.startswith("data:"):
+                data = line[5:]
+                self._event_data.append(data[1:] if data.startswith(" ") else data)
+            # Comments (":") and other fields (event, id, retry) are ignored
+        return messages
+
+
+def decode_stream(chunks: Iterable[bytes], framing: str = TEXT, encoding: str = "utf-8") -> Iterator[Any]:
+    """
+    Decode an iterable of byte chunks into messages.
+
+    Args:
+        chunks: Raw response chunks
+        framing: One of NDJSON, SSE or TEXT
+        encoding: Text encoding of the stream
+
+    Yields:
+        Complete messages
+    """
+    decoder = StreamDecoder(framing, encoding)
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.flush()
+
+
+def batched(
+    messages: Iterable[Any],
+    max_items: int = 64,
+    max_interval: float = 0.05
+) -> Iterator[List[Any]]:
+    """
+    Group messages into batches so a UI consumer sees a bounded update rate.
+
+    A batch is emitted once it holds max_items messages, or max_interval
+    seconds after the previous batch, whether or not more messages arrive,
+    so messages received just before a pause in the stream are not held
+    back for the length of the pause.
+
+    Messages are read on a helper thread into a queue of at most max_items,
+    so a slow consumer still stops the socket from being read. The helper
+    owns the iterator and closes it once the batches end or are closed;
+    callers must not close messages themselves.
+
+    Args:
+        messages: Iterable of messages
+        max_items: Largest batch size
+        max_interval: Minimum time in seconds between two partial batches
+
+    Yields:
+        Lists of messages
+    """
+    pending: "queue.Queue" = queue.Queue(maxsize=max(1, max_items))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read() -> None:
+        source = iter(messages)
+        try:
+            for message in source:
+                if not put((_MESSAGE, message)):
+                    return
+            put((_END, None))
+        except Exception as e:
+            put((_ERROR, e))
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+
+    threading.Thread(target=read, name="batched-reader", daemon=True).start()
+    batch = []
+    last = time.monotonic()
+    try:
+        while True:
+            timeout = None if not batch else max(0.0, last + max_interval - time.monotonic())
+            try:
+                kind, value = pending.get(timeout=timeout)
+            except queue.Empty:
+                # The stream went quiet with a partial batch waiting
+                yield batch
+                batch = []
+                last = time.monotonic()
+                continue
+            if kind is _END:
+                break
+            if kind is _ERROR:
+                raise value
+            batch.append(value)
+            now = time.monotonic()
+            if len(batch) >= max_items or now - last >= max_interval:
+                yield batch
+                batch = []
+                last = now
+        if batch:
+            yield batch
+    finally:
+        stop.set()
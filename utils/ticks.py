@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+import numpy as np
+
+from utils.utils import round_to_significant
+
+Ticks = List[List[Tuple[float, str]]]
+
+
+def tick_values(min_val: float, max_val: float, pixels: float = 0, min_spacing: float = 0) -> np.ndarray:
+    """
+    Evenly spaced tick positions for a value range.
+
+    The step is 1, 2 or 5 times a power of ten, giving five to ten ticks,
+    and is coarsened further when the ticks would sit closer than
+    min_spacing pixels apart on an axis pixels long.
+
+    Args:
+        min_val: Bottom of the visible range
+        max_val: Top of the visible range
+        pixels: Length of the axis in pixels, 0 to ignore
+        min_spacing: Smallest allowed distance between ticks in pixels
+
+    Returns:
+        Tick positions inside [min_val, max_val]
+    """
+    range_size = max_val - min_val
+    if not np.isfinite(range_size) or range_size <= 0:
+        return np.empty(0)
+    magnitude = 10 ** np.floor(np.log10(range_size))
+
+    if range_size / magnitude >= 5:
+        step = magnitude
+    elif range_size / magnitude >= 2:
+        step = magnitude / 2
+    else:
+        step = magnitude / 5
+
+    if pixels > 0 and min_spacing > 0:
+        max_ticks = max(2, int(pixels // min_spacing))
+        while range_size / step > max_ticks:
+            exponent = 10 ** np.floor(np.log10(step))
+            mantissa = round(step / exponent)
+            step = {1: 2, 2: 5}.get(mantissa, 10) * exponent
+
+    start = round_to_significant(min_val - (min_val % step))
+    end = round_to_significant(max_val + step)
+    values = np.arange(start, end, step)
+    return values[(values >= min_val) & (values <= max_val)]
+
+
+def format_ticks(values: np.ndarray, prefix: str = '', suffix: str = '') -> Ticks:
+    """
+    Format tick values with K/M suffixes, vectorized.
+
+    Values of a thousand or more become major ticks with one decimal and a
+    K or M suffix; smaller values become minor ticks shown as integers.
+
+    Args:
+        values: Tick positions
+        prefix: String to prepend to every label
+        suffix: String to append to every label
+
+    Returns:
+        [major_ticks, minor_ticks] as lists of (value, label)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    magnitude = np.abs(values)
+    millions = magnitude >= 1_000_000
+    thousands = (magnitude >= 1000) & ~millions
+    major = millions | thousands
+
+    scaled = np.where(millions, values / 1_000_000, values / 1000)[major]
+    unit = np.where(millions[major], "M", "K")
+    major_labels = np.char.add(np.char.mod("%.1f", scaled), unit)
+    minor_labels = np.char.mod("%d", np.trunc(values[~major]))
+
+    def labelled(positions: np.ndarray, labels: np.ndarray) -> List[Tuple[float, str]]:
+        labels = np.char.add(np.char.add(prefix, labels), f" {suffix}")
+        return list(zip(positions.tolist(), labels.tolist()))
+
+    return [labelled(values[major], major_labels), labelled(values[~major], minor_labels)]
+
+
+class TickCache:
+    """Small LRU of formatted ticks keyed by range, axis length and units."""
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Ticks]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def ticks(
+        self,
+        min_val: float,
+        max_val: float,
+        pixels: float = 0,
+        min_spacing: float = 0,
+        prefix: str = '',
+        suffix: str = ''
+    ) -> Ticks:
+        """
+        Cached tick_values followed by format_ticks.
+
+        Returns:
+            [major_ticks, minor_ticks] as lists of (value, label)
+        """
+        key = (float(min_val), float(max_val), int(pixels), min_spacing, prefix, suffix)
+        ticks = self._entries.get(key)
+        if ticks is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return ticks
+        self.misses += 1
+        ticks = format_ticks(tick_values(min_val, max_val, pixels, min_spacing), prefix, suffix)
+        self._entries[key] = ticks
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return ticks
+
+
+def unit_affixes(units: Optional[str]) -> Tuple[str, str]:
+    """Prefix and suffix for a unit: "$" is written before the value, anything else after."""
+    if not units:
+        return '', ''
+    if units == '$':
+        return f"{units} ", ''
+    return '', f"{units}"
@@ -0,0 +1,190 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import threading
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def available_encodings() -> List[str]:
+    """Content-Encodings this client can decode, best compression first."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.extend(["gzip", "deflate"])
+    return encodings
+
+
+def accept_encoding_header(preferred: Optional[str]) -> Optional[str]:
+    """
+    Build an Accept-Encoding value from a preference list.
+
+    Codecs whose optional package is not installed are dropped, so the server
+    is never offered an encoding the client cannot decode.
+
+    Args:
+        preferred: Comma separated codecs, e.g. "zstd, br, gzip"
+
+    Returns:
+        Header value, or None to leave the HTTP library default in place
+    """
+    if not preferred:
+        return None
+    available = available_encodings()
+    codecs = [c.strip() for c in preferred.split(",") if c.strip() in available or c.strip() == "identity"]
+    return ", ".join(codecs) or "identity"
+
+
+def _codec(encoding: str):
+    """Return (decode, flush) functions for one Content-Encoding, or None for identity."""
+    if encoding == "gzip":
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return decompressor.decompress, decompressor.flush
+    if encoding == "deflate":
+        decompressor = zlib.decompressobj()
+        return decompressor.decompress, decompressor.flush
+    if encoding == "br" and brotli is not None:
+        decompressor = brotli.Decompressor()
+        # brotlicffi exposes finish(), the reference bindings buffer nothing
+        finish = getattr(decompressor, "finish", None) or getattr(decompressor, "flush", None)
+        return decompressor.process, finish or bytes
+    if encoding == "zstd" and zstandard is not None:
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        return decompressor.decompress, decompressor.flush
+    if encoding in ("", "identity"):
+        return None
+    raise ValueError(f"unsupported content encoding {encoding!r}")
+
+
+class _Decoder:
+    """
+    Streaming decompressor for a Content-Encoding.
+
+    A chained value such as "gzip, br" lists the codecs in the order they
+    were applied, so they are undone last to first.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        codecs = [codec.strip() for codec in encoding.split(",")]
+        self._stages = [stage for stage in map(_codec, reversed(codecs)) if stage is not None]
+
+    def decode(self, chunk: bytes) -> bytes:
+        for decode, _ in self._stages:
+            chunk = decode(chunk)
+        return chunk
+
+    def flush(self) -> bytes:
+        """Return the bytes the decompressors still hold at end of stream."""
+        tail = b""
+        for decode, flush in self._stages:
+            tail = decode(tail) + flush()
+        return tail
+
+
+@dataclass
+class TransferStats:
+    url: str
+    encoding: str
+    wire_bytes: int
+    body_bytes: int
+    decode_seconds: float
+
+    @property
+    def ratio(self) -> float:
+        """Decompressed size over size on the wire."""
+        return self.body_bytes / self.wire_bytes if self.wire_bytes else 1.0
+
+
+class TransferLog:
+    """Bounded record of per-request transfer sizes and decode times."""
+
+    def __init__(self, max_entries: int = 1000) -> None:
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def record(self, stats: TransferStats) -> None:
+        with self._lock:
+            self._entries.append(stats)
+
+    def entries(self) -> List[TransferStats]:
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregate the log per content encoding.
+
+        Returns:
+            Mapping of encoding to request count, wire and body bytes,
+            compression ratio and total decode time
+        """
+        summary = {}
+        for stats in self.entries():
+            row = summary.setdefault(stats.encoding, {
+                "requests": 0, "wire_bytes": 0, "body_bytes": 0, "decode_seconds": 0.0
+            })
+            row["requests"] += 1
+            row["wire_bytes"] += stats.wire_bytes
+            row["body_bytes"] += stats.body_bytes
+            row["decode_seconds"] += stats.decode_seconds
+        for row in summary.values():
+            row["ratio"] = row["body_bytes"] / row["wire_bytes"] if row["wire_bytes"] else 1.0
+        return summary
+
+
+transfer_log = TransferLog()
+
+
+def read_body(response, chunk_size: int = 64 * 1024) -> bytes:
+    """
+    Read a streamed response body, decompressing it ourselves.
+
+    The response must have been requested with stream=True. Reading the raw,
+    still encoded bytes lets us record the size on the wire and the time spent
+    decompressing in transfer_log.
+
+    Args:
+        response: requests.Response opened with stream=True
+        chunk_size: Size of each raw read
+
+    Returns:
+        The decoded body
+    """
+    encoding = response.headers.get("Content-Encoding", "").strip().lower()
+    decoder = _Decoder(encoding)
+    parts = []
+    wire_bytes = 0
+    decode_seconds = 0.0
+    for chunk in response.raw.stream(chunk_size, decode_content=False):
+        wire_bytes += len(chunk)
+        start = time.perf_counter()
+        parts.append(decoder.decode(chunk))
+        decode_seconds += time.perf_counter() - start
+    start = time.perf_counter()
+    parts.append(decoder.flush())
+    decode_seconds += time.perf_counter() - start
+    body = b"".join(parts)
+    transfer_log.record(TransferStats(
+        url=response.url,
+        encoding=encoding or "identity",
+        wire_bytes=wire_bytes,
+        body_bytes=len(body),
+        decode_seconds=decode_seconds
+    ))
+    return body
@@ -1,4 +1,5 @@
-from typing import List, Tuple, Union
+from typing import List, NamedTuple, Optional, Tuple, Union
+import calendar
 import datetime
 import random
 import numpy as np
@@ -6,45 +7,190 @@ from PySide6.QtGui import QFont
 from pyqtgraph.graphicsItems.DateAxisItem import DateAxisItem
 
 from config import config
+from utils.color_utils import palette_index
 
 # Date and Time Utilities
+class DateTickLevel(NamedTuple):
+    name: str
+    unit: str  # numpy datetime64 unit the ticks are aligned to
+    count: int  # Ticks every count units
+    seconds: float  # Approximate tick spacing
+    example: str  # Widest label, used to size the spacing
+
+
+DATE_TICK_LEVELS = (
+    DateTickLevel("hour", "h", 1, 3600, "00:00"),
+    DateTickLevel("hour", "h", 3, 3 * 3600, "00:00"),
+    DateTickLevel("hour", "h", 6, 6 * 3600, "00:00"),
+    DateTickLevel("hour", "h", 12, 12 * 3600, "00:00"),
+    DateTickLevel("day", "D", 1, 86400, "00 Mmm"),
+    DateTickLevel("week", "W", 1, 7 * 86400, "00 Mmm"),
+    DateTickLevel("month", "M", 1, 30.44 * 86400, "0000"),
+    DateTickLevel("quarter", "M", 3, 91.31 * 86400, "Q0 0000"),
+    DateTickLevel("year", "Y", 1, 365.25 * 86400, "0000"),
+    DateTickLevel("year", "Y", 2, 2 * 365.25 * 86400, "0000"),
+    DateTickLevel("year", "Y", 5, 5 * 365.25 * 86400, "0000"),
+    DateTickLevel("year", "Y", 10, 10 * 365.25 * 86400, "0000"),
+    DateTickLevel("year", "Y", 20, 20 * 365.25 * 86400, "0000"),
+    DateTickLevel("year", "Y", 50, 50 * 365.25 * 86400, "0000"),
+    DateTickLevel("year", "Y", 100, 100 * 365.25 * 86400, "0000"),
+)
+
+MONTH_NAMES = np.array(calendar.month_abbr[1:])
+
+
+def local_utc_offset(timestamp: float) -> int:
+    """Seconds west of UTC of the local timezone at timestamp, as DateAxisItem.utcOffset expects."""
+    try:
+        return -int(datetime.datetime.fromtimestamp(timestamp).astimezone().utcoffset().total_seconds())
+    except (OverflowError, OSError, ValueError):
+        return 0
+
+
+def utc_offsets(timestamps: np.ndarray, offset: Optional[int] = None) -> np.ndarray:
+    """
+    Seconds west of UTC at each timestamp.
+
+    A fixed offset applies to every timestamp; with None the local timezone
+    is looked up once per distinct timestamp, so ranges crossing a daylight
+    saving change get the right offset on either side of it.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    if offset is not None:
+        return np.full(timestamps.shape, offset, dtype=np.int64)
+    unique, inverse = np.unique(timestamps, return_inverse=True)
+    return np.array([local_utc_offset(t) for t in unique], dtype=np.int64)[inverse].reshape(timestamps.shape)
+
+
+def date_tick_values(level: DateTickLevel, minVal: float, maxVal: float, offset: Optional[int] = None) -> np.ndarray:
+    """
+    Timestamps of the ticks of level between minVal and maxVal.
+
+    Ticks are aligned in local time (UTC minus offset seconds, or the local
+    timezone at each tick when offset is None) using datetime64 arithmetic:
+    whole hours, midnights, Mondays, first days of a month or quarter, or
+    years divisible by the step.
+
+    Returns:
+        Unix timestamps of the ticks
+    """
+    bounds = utc_offsets([minVal, maxVal], offset)
+    local_min = np.datetime64(int(np.floor(minVal - bounds.max())), "s")
+    local_max = np.datetime64(int(np.ceil(maxVal - bounds.min())), "s")
+    if level.unit == "W":
+        # 1970-01-05 was the first Monday after the epoch
+        first = local_min.astype("datetime64[D]").astype(np.int64)
+        first -= (first - 4) % 7
+        last = local_max.astype("datetime64[D]").astype(np.int64)
+        ticks = np.arange(first, last + 1, 7).astype("datetime64[D]")
+    else:
+        first = local_min.astype(f"datetime64[{level.unit}]").astype(np.int64)
+        last = local_max.astype(f"datetime64[{level.unit}]").astype(np.int64)
+        # Align years to calendar years, everything else to the epoch
+        base = 1970 if level.unit == "Y" else 0
+        first = (first + base) // level.count * level.count - base
+        ticks = np.arange(first, last + 1, level.count).astype(f"datetime64[{level.unit}]")
+    local = ticks.astype("datetime64[s]").astype(np.int64)
+    # The offset of a local time is that of the instant it maps to; starting
+    # from the offset at minVal one refinement settles it outside the
+    # skipped or repeated hour of a transition
+    values = local + utc_offsets(local + bounds[0], offset)
+    # A tick in the hour skipped by a transition lands on the next one
+    values = np.unique(local + utc_offsets(values, offset))
+    return values[(values >= minVal) & (values <= maxVal)].astype(np.float64)
+
+
+def date_tick_strings(level: DateTickLevel, values: np.ndarray, offset: Optional[int] = None) -> List[str]:
+    """
+    Vectorized labels for date ticks.
+
+    Hours show "HH:MM" with the date at midnight, days and weeks "D Mon",
+    months "Mon" with the year on January, quarters "Qn YYYY" and years "YYYY".
+    Each value is shifted by its own UTC offset when offset is None.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    local = (values - utc_offsets(values, offset)).astype(np.int64).astype("datetime64[s]")
+    months = local.astype("datetime64[M]")
+    years = (months.astype(np.int64) // 12 + 1970).astype(str)
+    month = months.astype(np.int64) % 12
+    days = (local.astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64) + 1
+    dates = np.char.add(np.char.add(days.astype(str), " "), MONTH_NAMES[month])
+    if level.name == "hour":
+        minutes = (local - local.astype("datetime64[D]")).astype(np.int64) // 60
+        times = np.char.add(
+            np.char.add(np.char.zfill((minutes // 60).astype(str), 2), ":"),
+            np.char.zfill((minutes % 60).astype(str), 2)
+        )
+        return np.where(minutes == 0, dates, times).tolist()
+    if level.name in ("day", "week"):
+        return dates.tolist()
+    if level.name == "month":
+        return np.where(month == 0, years, MONTH_NAMES[month]).tolist()
+    if level.name == "quarter":
+        return np.char.add(np.char.add(np.char.add("Q", (month // 3 + 1).astype(str)), " "), years).tolist()
+    return years.tolist()
+
+
 class CustomDateAxisItem(DateAxisItem):
-    """Custom date axis formatter for monthly intervals."""
-    
-    def tickSpacing(self, minVal: float, maxVal: float, size: int) -> List[Tuple[float, int]]:
-        """Override to force monthly tick intervals."""
-        return [(3600*24*30.5, 0)]  # One month intervals
+    """
+    Date axis that adapts its tick spacing to the visible span.
 
-    def tickStrings(self, values: List[float], scale: float, spacing: float) -> List[str]:
-        """Format tick labels to show month names."""
-        strings = []
-        for value in values:
-            try:
-                dt = datetime.datetime.fromtimestamp(value)
-                strings.append(dt.strftime("%b") if dt.day <= 15 else '')
-            except:
-                strings.append('')
-        return strings
+    Picks hour, day, week, month, quarter or year ticks so labels sit at
+    least one label width apart, generates them with datetime64 arithmetic
+    and memoizes the label strings across repaints.
+    """
+
+    label_cache_size = 4096
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.level = DATE_TICK_LEVELS[-1]
+        self._levels_by_spacing = {level.seconds: level for level in DATE_TICK_LEVELS}
+        self._last_ticks = None
+        self._labels = {}
+
+    def _label_width(self, text: str) -> int:
+        """Pixels a label needs, including padding."""
+        metrics = getattr(self, "fontMetrics", None)
+        width = metrics.boundingRect(text).width() if metrics is not None else 7 * len(text)
+        return width + config.chart.date_tick_padding
+
+    def tickSpacing(self, minVal: float, maxVal: float, size: int) -> List[Tuple[float, int]]:
+        """Choose the finest level whose labels fit in size pixels."""
+        density = (maxVal - minVal) / size if size > 0 else np.inf
+        self.level = DATE_TICK_LEVELS[-1]
+        for level in DATE_TICK_LEVELS:
+            if level.seconds / density >= self._label_width(level.example):
+                self.level = level
+                break
+        return [(self.level.seconds, 0)]
 
     def tickValues(self, minVal: float, maxVal: float, size: int) -> List[Tuple[float, List[float]]]:
-        """Generate ticks for the middle of each month."""
+        """Generate ticks for the chosen level, reusing the last result for an unchanged view."""
+        key = (minVal, maxVal, size, self.utcOffset)
+        if self._last_ticks is not None and self._last_ticks[0] == key:
+            return self._last_ticks[1]
         spacing = self.tickSpacing(minVal, maxVal, size)[0][0]
-        start_dt = datetime.datetime.fromtimestamp(minVal)
-        end_dt = datetime.datetime.fromtimestamp(maxVal)
-        
-        if start_dt.day != 1:
-            start_dt = (start_dt.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
-        
-        timestamps = []
-        current = start_dt
-        while current <= end_dt:
-            mid_month = current.replace(day=15)
-            timestamps.append(mid_month.timestamp())
-            current = (current + datetime.timedelta(days=32)).replace(day=1)
-            
-        return [(spacing, timestamps)]
-
+        values = date_tick_values(self.level, minVal, maxVal, self.utcOffset)
+        ticks = [(spacing, values.tolist())]
+        self._last_ticks = (key, ticks)
+        return ticks
 
+    def tickStrings(self, values: List[float], scale: float, spacing: float) -> List[str]:
+        """Format tick labels for the level that produced them, memoized per value."""
+        level = self._levels_by_spacing.get(spacing, self.level)
+        labels = [self._labels.get((level, value)) for value in values]
+        missing = [value for value, label in zip(values, labels) if label is None]
+        if missing:
+            try:
+                fresh = date_tick_strings(level, np.asarray(missing), self.utcOffset)
+            except (OverflowError, ValueError):
+                fresh = [''] * len(missing)
+            if len(self._labels) > self.label_cache_size:
+                self._labels.clear()
+            self._labels.update(((level, value), label) for value, label in zip(missing, fresh))
+            labels = [self._labels[(level, value)] for value in values]
+        return labels
 
 
 # Styling Utilities
@@ -59,6 +205,9 @@ def apply_font_style(widget) -> None:
 def find_furthest_color(palette: List[str], existing_colors: List[str]) -> str:
     """
     Find the color from palette that's most different from existing colors.
+
+    Distances are measured in CIELAB using the cached palette_index. Plots
+    that assign many colors should keep a PaletteIndex instead.
     
     Args:
         palette: List of available colors in hex format
@@ -69,18 +218,61 @@ def find_furthest_color(palette: List[str], existing_colors: List[str]) -> str:
     """
     if not existing_colors:
         return random.choice(palette)
-        
-    def color_distance(c1: str, c2: str) -> float:
-        c1_rgb = tuple(int(c1.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
-        c2_rgb = tuple(int(c2.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
-        return sum((a-b)**2 for a, b in zip(c1_rgb, c2_rgb))**0.5
-        
-    return max(
-        palette,
-        key=lambda c: min(color_distance(c, ec) for ec in existing_colors)
-    )
+    index = palette_index(tuple(palette))
+    min_distance = np.min([index.distances_to(c) for c in existing_colors], axis=0)
+    return palette[int(np.argmax(min_distance))]
 
 # Numerical Utilities
+class NearestIndex:
+    """
+    Nearest-sample lookup over a fixed array of x values.
+
+    Sorted input is searched in place with a binary search; unsorted input is
+    argsorted once up front. Each lookup is O(log n).
+    """
+
+    def __init__(self, values: np.ndarray, assume_sorted: bool = False) -> None:
+        """
+        Build the index.
+
+        Args:
+            values: 1-D array of x values
+            assume_sorted: Skip the O(n) sortedness check, e.g. for live data
+                appended in x order
+        """
+        self.values = np.asarray(values)
+        self._order = None
+        self._sorted = self.values
+        if assume_sorted:
+            return
+        if len(self.values) > 1 and not np.all(self.values[1:] >= self.values[:-1]):
+            self._order = np.argsort(self.values, kind="stable")
+            self._sorted = self.values[self._order]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def is_sorted(self) -> bool:
+        """Whether values were already in ascending order."""
+        return self._order is None
+
+    def nearest(self, target: float) -> int:
+        """
+        Return the index into values of the sample closest to target.
+
+        Ties resolve to the earlier sample. Returns -1 for an empty index.
+        """
+        n = len(self._sorted)
+        if n == 0:
+            return -1
+        i = int(self._sorted.searchsorted(target))
+        if i >= n:
+            i = n - 1
+        elif i > 0 and target - self._sorted[i - 1] <= self._sorted[i] - target:
+            i -= 1
+        return int(self._order[i]) if self._order is not None else i
+
 def round_to_significant(value: float) -> float:
     """
     Round a number to its first significant digit.
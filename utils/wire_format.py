@@ -0,0 +1,145 @@
+"""
+Compact columnar wire format for chart data.
+
+A block is laid out as::
+
+    magic   4 bytes   b"HCOL"
+    version uint16
+    ncols   uint16
+    nrows   uint64
+    ncols x 8-byte NumPy dtype strings (e.g. b"<f8", b"<M8[s]"), NUL padded
+    ncols x column data, each starting on an 8-byte boundary
+
+All integers are little endian. Columns decode with np.frombuffer, so the
+returned arrays are read-only views over the response body rather than copies.
+
+Batched responses are a stream of frames, each a uint32 chart index and a
+uint64 length followed by one block, so every chart can be decoded as soon
+as its frame has arrived.
+"""
+from typing import List, Sequence, Tuple
+import struct
+import numpy as np
+
+MEDIA_TYPE = "application/x-harmonic-columns"
+BATCH_MEDIA_TYPE = "application/x-harmonic-batch"
+MAGIC = b"HCOL"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHQ")
+_FRAME = struct.Struct("<IQ")
+_DTYPE_SIZE = 8
+_ALIGN = 8
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def encode_columns(columns: Sequence[np.ndarray]) -> bytes:
+    """
+    Encode equally sized 1-D columns into a single block.
+
+    Args:
+        columns: Sequence of 1-D arrays with the same length
+
+    Returns:
+        Encoded block
+    """
+    columns = [np.ascontiguousarray(column) for column in columns]
+    nrows = len(columns[0]) if columns else 0
+    if any(column.ndim != 1 or len(column) != nrows for column in columns):
+        raise ValueError("columns must be 1-D and of equal length")
+
+    parts = [_HEADER.pack(MAGIC, VERSION, len(columns), nrows)]
+    for column in columns:
+        dtype = column.dtype.newbyteorder("<") if column.dtype.byteorder == ">" else column.dtype
+        dtype_str = dtype.str.encode("ascii")
+        if len(dtype_str) > _DTYPE_SIZE:
+            raise ValueError(f"unsupported dtype {dtype}")
+        parts.append(dtype_str.ljust(_DTYPE_SIZE, b"\0"))
+
+    offset = _HEADER.size + _DTYPE_SIZE * len(columns)
+    for column in columns:
+        padding = _aligned(offset) - offset
+        parts.append(b"\0" * padding)
+        data = column.astype(column.dtype.newbyteorder("<"), copy=False).tobytes()
+        parts.append(data)
+        offset += padding + len(data)
+    return b"".join(parts)
+
+
+def decode_columns(buffer, offset: int = 0) -> List[np.ndarray]:
+    """
+    Decode a block into read-only arrays that share memory with buffer.
+
+    Args:
+        buffer: bytes-like object holding the block
+        offset: Position of the block within buffer
+
+    Returns:
+        List of 1-D arrays, one per column
+    """
+    view = memoryview(buffer)
+    magic, version, ncols, nrows = _HEADER.unpack_from(view, offset)
+    if magic != MAGIC:
+        raise ValueError("not a harmonic column block")
+    if version != VERSION:
+        raise ValueError(f"unsupported column block version {version}")
+
+    position = offset + _HEADER.size
+    dtypes = []
+    for _ in range(ncols):
+        dtype_str = bytes(view[position:position + _DTYPE_SIZE]).rstrip(b"\0")
+        dtypes.append(np.dtype(dtype_str.decode("ascii")))
+        position += _DTYPE_SIZE
+
+    columns = []
+    for dtype in dtypes:
+        position = offset + _aligned(position - offset)
+        columns.append(np.frombuffer(view, dtype=dtype, count=nrows, offset=position))
+        position += dtype.itemsize * nrows
+    return columns
+
+
+
+def encode_frame(index: int, columns: Sequence[np.ndarray]) -> bytes:
+    """Encode one chart of a batched response as an indexed, length-prefixed frame."""
+    block = encode_columns(columns)
+    return _FRAME.pack(index, len(block)) + block
+
+
+class FrameDecoder:
+    """Incremental decoder for a stream of batch frames."""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> List[Tuple[int, List[np.ndarray]]]:
+        """
+        Consume a chunk and return the (index, columns) frames it completes.
+
+        Args:
+            chunk: Raw bytes read from the response
+
+        Returns:
+            List of decoded frames, possibly empty
+        """
+        self._buffer += chunk
+        frames = []
+        position = 0
+        while len(self._buffer) - position >= _FRAME.size:
+            index, length = _FRAME.unpack_from(self._buffer, position)
+            end = position + _FRAME.size + length
+            if len(self._buffer) < end:
+                break
+            block = bytes(self._buffer[position + _FRAME.size:end])
+            frames.append((index, decode_columns(block)))
+            position = end
+        del self._buffer[:position]
+        return frames
+
+    @property
+    def pending(self) -> int:
+        """Bytes received that do not yet form a complete frame."""
+        return len(self._buffer)
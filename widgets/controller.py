@@ -8,7 +8,10 @@ from config import config
 import numpy as np
 from widgets.command_input import CommandInput  # Add this import
 from utils.color_utils import get_contrast_color  # Add this import
-from utils.app_requests import gestalt_get, gestalt_post 
+from utils.compact import compact_values
+from utils.app_requests import gestalt_batch, gestalt_get_range, gestalt_post
+from utils.fetch_engine import FetchEngine
+from widgets.placeholder_object import PlaceholderObject
 
 class Controller(QWidget):
     """Widget for accepting text commands and controlling the canvas."""
@@ -20,6 +23,9 @@ class Controller(QWidget):
         self.command_mode = True
         self.current_command = None
         self.token = None
+        self.pending_fetches = {}  # job_id -> (canvas, placeholder, title)
+        self.pending_batches = {}  # job_id -> {chart index: (canvas, placeholder, title)}
+        self.setup_fetch_engine()
         self.setup_ui()
         
     def get_next_color(self) -> str:
@@ -28,6 +34,14 @@ class Controller(QWidget):
         self.current_color_index = (self.current_color_index + 1) % len(config.chart.color_palette)
         return color
 
+    def setup_fetch_engine(self):
+        """Create the background fetch engine and connect its result signals."""
+        self.fetch_engine = FetchEngine(config.controller.max_fetch_threads, self)
+        self.fetch_engine.finished.connect(self.on_fetch_finished)
+        self.fetch_engine.failed.connect(self.on_fetch_failed)
+        self.fetch_engine.cancelled.connect(self.on_fetch_cancelled)
+        self.fetch_engine.stream_batch.connect(self.on_batch_parts)
+
     def setup_ui(self):
         """Initialize the UI components."""
         layout = QVBoxLayout(self)
@@ -114,15 +128,11 @@ class Controller(QWidget):
             # Create payload and execute
             if self.current_command == "/chart":
                 model_query = self.command_input.text().strip()
-                data = gestalt_get(self.token.token, {"config_name":model_query, "brand":"lume", "startdate":"2023-05-01", "enddate":"2023-12-31"})
-                # self.current_request = ChartAssetPayload(
-                #     title="command test",
-                #     x_values=data[0],
-                #     y_label_left=["revneue", "spend"],
-                #     y_label_right=["roas"]
-                #     y_values_left=[data[1], data[2]],
-                #     y_values_right=[data[3]],)
-                # self.execute_payload()
+                names = [name.strip() for name in model_query.split(",") if name.strip()]
+                if len(names) > 1:
+                    self.fetch_charts(names)
+                else:
+                    self.fetch_chart(model_query, self.chart_query(model_query))
                 self.command_input.clear()
                 self.command_input.setPlaceholderText(config.controller.placeholder_text)
                 self.context_label.setText("")  # Clear the text
@@ -133,10 +143,157 @@ class Controller(QWidget):
                 """)
                 self.command_mode = True
 
-    def execute_payload(self):
-        if self.current_canvas:
-           new_window = self.create_draggable_object(self.current_request)
-           self.current_canvas.add_window(new_window)
+    def chart_query(self, config_name: str) -> dict:
+        """Build the gestalt_get query for a chart config."""
+        return {"config_name":config_name, "brand":"lume", "startdate":"2023-05-01", "enddate":"2023-12-31"}
+
+    def fetch_chart(self, title: str, query: dict):
+        """
+        Fetch chart data in the background, showing a placeholder meanwhile.
+
+        A newer query for the same chart on the same canvas supersedes a pending one.
+        """
+        canvas = self.current_canvas
+        placeholder = PlaceholderObject(title)
+        canvas.add_placeholder(placeholder)
+        job_id = self.fetch_engine.submit(
+            (id(canvas), query["config_name"]),
+            gestalt_get_range,
+            self.token.token,
+            query
+        )
+        placeholder.cancel_requested.connect(lambda _: self.cancel_fetch(job_id, placeholder))
+        self.pending_fetches[job_id] = (canvas, placeholder, title)
+
+    def fetch_charts(self, titles: list):
+        """
+        Fetch several charts in a single batched request.
+
+        Placeholders are laid out in a grid and each is replaced by its chart
+        as soon as that chart's part of the response arrives.
+        """
+        canvas = self.current_canvas
+        spacing = config.controller.batch_spacing
+        columns = config.controller.batch_columns
+        parts = {}
+        for index, title in enumerate(titles):
+            placeholder = PlaceholderObject(title)
+            rect = placeholder.boundingRect()
+            canvas.add_placeholder(placeholder, (
+                -400 + (index % columns) * (rect.width() + spacing),
+                -150 + (index // columns) * (rect.height() + spacing)
+            ))
+            parts[index] = (canvas, placeholder, title)
+
+        job_id = self.fetch_engine.submit_stream(
+            (id(canvas), tuple(titles)),
+            gestalt_batch,
+            self.token.token,
+            [self.chart_query(title) for title in titles]
+        )
+        for index, (_, placeholder, _) in parts.items():
+            placeholder.cancel_requested.connect(
+                lambda _, index=index, placeholder=placeholder: self.cancel_batch_part(job_id, index, placeholder)
+            )
+        self.pending_batches[job_id] = parts
+
+    def cancel_batch_part(self, job_id: int, index: int, placeholder: PlaceholderObject):
+        """Drop one chart of a batch; the request is cancelled once none are left."""
+        parts = self.pending_batches.get(job_id)
+        if parts is not None:
+            parts.pop(index, None)
+            if not parts:
+                self.fetch_engine.cancel(job_id)
+        placeholder.remove()
+
+    @Slot(int, object)
+    def on_batch_parts(self, job_id: int, parts):
+        """Build the charts of a batch whose data has arrived."""
+        pending = self.pending_batches.get(job_id)
+        if pending is None:
+            return
+        for index, data in parts:
+            if index not in pending:
+                continue
+            canvas, placeholder, title = pending.pop(index)
+            pos = placeholder.pos()
+            placeholder.remove()
+            self.current_request = self.build_chart_payload(title, data)
+            self.execute_payload(canvas, (pos.x(), pos.y()))
+
+    def cancel_fetch(self, job_id: int, placeholder: PlaceholderObject):
+        """Cancel a pending fetch, or dismiss its placeholder if it already failed."""
+        if self.fetch_engine.is_pending(job_id):
+            self.fetch_engine.cancel(job_id)
+        else:
+            placeholder.remove()
+
+    @Slot(int, object)
+    def on_fetch_finished(self, job_id: int, data):
+        """Build the chart on the GUI thread once its data has arrived."""
+        if job_id in self.pending_batches:
+            for _, placeholder, _ in self.pending_batches.pop(job_id).values():
+                placeholder.set_error("no data returned")
+            return
+        if job_id not in self.pending_fetches:
+            return
+        canvas, placeholder, title = self.pending_fetches.pop(job_id)
+        if data is None:
+            placeholder.set_error("request failed")
+            return
+        pos = placeholder.pos()
+        placeholder.remove()
+        self.current_request = self.build_chart_payload(title, data)
+        self.execute_payload(canvas, (pos.x(), pos.y()))
+
+    @Slot(int, str)
+    def on_fetch_failed(self, job_id: int, error: str):
+        for _, placeholder, _ in self.pending_batches.pop(job_id, {}).values():
+            placeholder.set_error(error)
+        if job_id in self.pending_fetches:
+            _, placeholder, _ = self.pending_fetches.pop(job_id)
+            placeholder.set_error(error)
+
+    @Slot(int)
+    def on_fetch_cancelled(self, job_id: int):
+        for _, placeholder, _ in self.pending_batches.pop(job_id, {}).values():
+            placeholder.remove()
+        if job_id in self.pending_fetches:
+            _, placeholder, _ = self.pending_fetches.pop(job_id)
+            placeholder.remove()
+
+    def build_chart_payload(self, title: str, data) -> ChartAssetPayload:
+        """Convert raw (x, y, ...) columns from the server into a chart payload."""
+        x_values = np.asarray(data[0])
+        is_datetime = x_values.dtype.kind in "USM"
+        if is_datetime:
+            x_values = x_values.astype("datetime64[s]", copy=False).view(np.int64)
+            if not config.performance.compact_storage:
+                x_values = x_values.astype(np.float64)
+        if config.performance.compact_storage:
+            y_values = [
+                compact_values(column, config.performance.decimal_precision, config.performance.quantize_values)
+                for column in data[1:]
+            ]
+        else:
+            y_values = [np.asarray(column, dtype=np.float64) for column in data[1:]]
+        return ChartAssetPayload(
+            title=title,
+            x_values=x_values,
+            y_label_left=[title] if len(y_values) == 1 else [f"{title} {i}" for i in range(len(y_values))],
+            y_values_left=y_values,
+            multi_line=len(y_values) > 1,
+            is_datetime=is_datetime
+        )
+
+    def execute_payload(self, canvas=None, pos=None):
+        canvas = canvas or self.current_canvas
+        if canvas:
+            new_window = self.create_draggable_object(self.current_request)
+            if pos is None:
+                canvas.add_window(new_window)
+            else:
+                canvas.add_window(new_window, pos)
 
     @Slot(InfiniteCanvas)
     def set_current_canvas(self, canvas: InfiniteCanvas):
@@ -1,9 +1,10 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import numpy as np
 from PySide6.QtWidgets import (
     QGraphicsItem,
     QGraphicsProxyWidget,
-    QPushButton
+    QPushButton,
+    QWidget
 )
 from PySide6.QtCore import (
     QObject,
@@ -12,8 +13,8 @@ from PySide6.QtCore import (
     QMarginsF,
     Qt
 )
-from PySide6.QtGui import QPen, QColor
-from widgets.header_widget import HeaderWidget
+from PySide6.QtGui import QPen, QColor, QPainter, QPixmap
+from widgets.header_widget import HeaderWidget, PaintedHeaderWidget
 from widgets.harmonic_plot import HarmonicPlot
 from models.asset_payload import AssetPayload
 from config import config
@@ -23,11 +24,13 @@ class DraggableObject(QGraphicsItem, QObject):
     """
     A draggable widget container that can hold a plot and header.
     
-    Supports selection, dragging, and closing functionality.
+    Supports selection, dragging, and closing functionality. Off-screen
+    windows can be frozen to a snapshot of their widgets or unloaded down to
+    their payload, and are brought back with thaw().
     """
     
-    selected_item = None
     clicked = Signal()
+    moved = Signal()
     closed = Signal(object)
 
     def __init__(
@@ -44,17 +47,30 @@ class DraggableObject(QGraphicsItem, QObject):
         """
         super().__init__()
         QObject.__init__(self)
-        self.setFlags(QGraphicsItem.ItemIsMovable | QGraphicsItem.ItemIsSelectable)
+        # Selection is tracked by the canvas' SelectionManager, not Qt's
+        # item selection, which repaints the whole item on every change
+        self.setFlags(QGraphicsItem.ItemIsMovable)
         self.payload = payload
         # Cache commonly used values
         self._plot_height = payload.height * config.draggable.plot_height_ratio
         self._title_height = payload.height * config.draggable.title_height_ratio
         self._width = payload.width
         self.title = payload.title
+        self.plot = None
+        self.highlighted = False
+        self.residency = "live"  # "live", "snapshot" or "unloaded"
+        self.detail = "full"  # "full" or "sparkline"
+        self.snapshot: Optional[QPixmap] = None
+        self.snapshot_detail = None  # Detail and scale the snapshot was taken at
+        self.snapshot_scale = None
+        self.series_colors: List[str] = []
+        self._view_range = None
         
         # Configure appearance using config values
         self.selected_color = QPen(QColor(config.draggable.selected_color), config.draggable.border_width)
         self.unselected_color = QPen(QColor(config.draggable.unselected_color), config.draggable.border_width)
+        self.placeholder_color = QColor(config.chart.background_color)
+        self.title_color = QColor(config.font.color)
         
         # Set up widget proxies
         self.header_proxy = QGraphicsProxyWidget(self)
@@ -87,8 +103,13 @@ class DraggableObject(QGraphicsItem, QObject):
         self.deleteLater()
 
     def addHeader(self) -> None:
-        """Create and add the header widget."""
-        self.header_widget = HeaderWidget(self.title, self._width, int(self._title_height))
+        """Create and add the header widget, painted for charts with many series."""
+        series = len(self.payload.y_values_left or [])
+        if self.payload.dual_axis:
+            series += len(self.payload.y_values_right or [])
+        threshold = config.header.painted_series_threshold
+        header_type = PaintedHeaderWidget if series >= threshold else HeaderWidget
+        self.header_widget = header_type(self.title, self._width, int(self._title_height))
         self.header_proxy.setWidget(self.header_widget)
 
     def addContent(self, content: HarmonicPlot) -> None:
@@ -105,19 +126,32 @@ class DraggableObject(QGraphicsItem, QObject):
         self.plot_proxy.setWidget(content)
         self.plot_proxy.setPos(0, self.header_proxy.size().height())
 
-    def createContent(self) -> None:
+    def createContent(self, colors: Optional[List[str]] = None) -> None:
         """
         Add a Harmonic plot to this draggable object.
+
+        Args:
+            colors: Line colors in payload order, given when rebuilding an
+                unloaded chart so it comes back looking the same
         """
                 # Handle payload based on type
         if self.payload.type == "chart":
             plot = HarmonicPlot(x_vals=self.payload.x_values, enable_mouseover=self.payload.enable_mouseover, is_datetime=self.payload.is_datetime)
+            self.plot = plot
             self.addContent(plot)
-            for line in self.payload.y_values_left:
-                plot.addNewLines(line, data_label=self.payload.y_label_left, units=self.payload.left_units)
+            colors = iter(colors or [])
+            self.series_colors = []
+            lines = self.payload.y_values_left or []
+            # Labels are optional; unlabelled series are drawn without hover values
+            labels = self.payload.y_label_left or [None] * len(lines)
+            for line, label in zip(lines, labels):
+                plot.addNewLines(line, data_label=label, units=self.payload.left_units, color=next(colors, None))
+                self.series_colors.append(plot.color_map[label])
             if self.payload.dual_axis:
                 for line in self.payload.y_values_right:
-                    plot.addNewLines(line, data_label=self.payload.y_label_right, units=self.payload.right_units, plot_on_right=True)
+                    plot.addNewLines(line, data_label=self.payload.y_label_right, units=self.payload.right_units, plot_on_right=True, color=next(colors, None))
+                    self.series_colors.append(plot.color_map[self.payload.y_label_right])
+            plot.set_sparkline(self.detail == "sparkline")
 
         elif self.payload.type == "table":
             # Add table handling here if needed
@@ -140,11 +174,163 @@ class DraggableObject(QGraphicsItem, QObject):
             option: QStyleOptionGraphicsItem instance
             widget: Optional widget being painted
         """
-        pen = self.selected_color if DraggableObject.selected_item == self else self.unselected_color
+        if self.snapshot is not None:
+            painter.drawPixmap(self.rect, self.snapshot, QRectF(self.snapshot.rect()))
+        elif self.residency == "unloaded":
+            painter.fillRect(self.rect, self.placeholder_color)
+            painter.setPen(self.title_color)
+            painter.drawText(
+                QRectF(8, 0, self.rect.width() - 16, self._title_height),
+                Qt.AlignLeft | Qt.AlignVCenter,
+                self.title or ""
+            )
+        pen = self.selected_color if self.highlighted else self.unselected_color
         pen.setJoinStyle(Qt.BevelJoin)
         painter.setPen(pen)
         painter.drawRect(self.rect)
 
+    def border_rects(self) -> List[QRectF]:
+        """The four strips, in item coordinates, covered by the border pen."""
+        pad = config.draggable.border_width / 2 + 1
+        outer = self.rect.adjusted(-pad, -pad, pad, pad)
+        left, top, right, bottom = outer.left(), outer.top(), outer.right(), outer.bottom()
+        edge = 2 * pad
+        return [
+            QRectF(left, top, outer.width(), edge),
+            QRectF(left, bottom - edge, outer.width(), edge),
+            QRectF(left, top, edge, outer.height()),
+            QRectF(right - edge, top, edge, outer.height()),
+        ]
+
+    def set_highlighted(self, highlighted: bool) -> None:
+        """
+        Show or clear the selected border.
+
+        The strips are invalidated through the scene, since an item merges
+        its own update() calls into one rect covering the whole window. The
+        z-value is left alone, as changing it marks the embedded header and
+        plot dirty too; SelectionManager raises the window when it overlaps
+        another.
+
+        Args:
+            highlighted: Whether the window is the selected one
+        """
+        if highlighted == self.highlighted:
+            return
+        self.highlighted = highlighted
+        scene = self.scene()
+        if scene is None:
+            self.update()
+            return
+        for rect in self.border_rects():
+            scene.update(self.mapRectToScene(rect))
+
+    def set_detail(self, detail: str) -> None:
+        """
+        Draw the plot in full or as a sparkline.
+
+        The choice is remembered, so an unloaded chart is rebuilt with it.
+
+        Args:
+            detail: "full" or "sparkline"
+        """
+        self.detail = detail
+        if self.plot is not None:
+            self.plot.set_sparkline(detail == "sparkline")
+
+    def _set_proxies_visible(self, visible: bool) -> None:
+        for proxy in (self.header_proxy, self.plot_proxy, self.close_btn_proxy):
+            if proxy is not None:
+                proxy.setVisible(visible)
+
+    def _grab_snapshot(self, scale: float = 1.0) -> QPixmap:
+        """Render the header and plot into one pixmap, scale times the window size."""
+        size = self.rect.size() * scale
+        pixmap = QPixmap(max(1, round(size.width())), max(1, round(size.height())))
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.scale(scale, scale)
+        for proxy in (self.header_proxy, self.plot_proxy):
+            widget = proxy.widget()
+            if widget is not None:
+                # QGraphicsView.render draws the scene, so use the widget's own
+                QWidget.render(widget, painter, proxy.pos().toPoint())
+        painter.end()
+        return pixmap
+
+    def can_unload(self) -> bool:
+        """Whether the window can be rebuilt from its payload alone."""
+        # Points appended by a live feed only exist in the plot's ring buffer
+        return self.payload.type == "chart" and (self.plot is None or self.plot.live is None)
+
+    def freeze(self, scale: float = 1.0) -> None:
+        """
+        Hide the embedded widgets and paint a snapshot of them instead.
+
+        Args:
+            scale: Resolution of the snapshot relative to the window; charts
+                only ever seen zoomed out can use a smaller one
+        """
+        if self.residency != "live":
+            return
+        self.snapshot = self._grab_snapshot(scale)
+        self.snapshot_detail = self.detail
+        self.snapshot_scale = scale
+        self._set_proxies_visible(False)
+        self.residency = "snapshot"
+        self.update()
+
+    def unload(self) -> bool:
+        """
+        Destroy the embedded header and plot, keeping only the payload.
+
+        The plot's view range and line colors are remembered so thaw()
+        rebuilds the same chart. Windows that cannot be rebuilt are left
+        as they are, for the caller to freeze when it has time to.
+
+        Returns:
+            Whether the window is unloaded
+        """
+        if self.residency == "unloaded":
+            return True
+        if not self.can_unload():
+            return False
+        if self.plot is not None:
+            vb = self.plot.vb
+            self._view_range = None if any(vb.autoRangeEnabled()) else vb.viewRange()
+        self._set_proxies_visible(False)
+        # Deleting the proxies deletes the widgets they embed; unembedding a
+        # widget would leave its Python wrapper, and the series data it
+        # holds, owned by the proxy
+        for proxy in (self.header_proxy, self.plot_proxy):
+            proxy.setParentItem(None)
+            proxy.deleteLater()
+        self.header_proxy = self.plot_proxy = None
+        self.plot = None
+        self.header_widget = None
+        self.snapshot = None
+        self.residency = "unloaded"
+        self.update()
+        return True
+
+    def thaw(self) -> None:
+        """Bring back the live header and plot, rebuilding them if unloaded."""
+        if self.residency == "live":
+            return
+        if self.residency == "unloaded":
+            self.header_proxy = QGraphicsProxyWidget(self)
+            self.plot_proxy = QGraphicsProxyWidget(self)
+            for proxy in (self.header_proxy, self.plot_proxy):
+                proxy.stackBefore(self.close_btn_proxy)
+            self.createContent(self.series_colors)
+            if self._view_range is not None and self.plot is not None:
+                x_range, y_range = self._view_range
+                self.plot.vb.setRange(xRange=x_range, yRange=y_range, padding=0)
+        self._set_proxies_visible(True)
+        self.snapshot = None
+        self.residency = "live"
+        self.update()
+
     def mousePressEvent(self, event) -> None:
         """
         Handle mouse press events for selection.
@@ -152,12 +338,9 @@ class DraggableObject(QGraphicsItem, QObject):
         Args:
             event: QGraphicsSceneMouseEvent instance
         """
-        if DraggableObject.selected_item and DraggableObject.selected_item != self:
-            DraggableObject.selected_item = None
-            
-        DraggableObject.selected_item = self
         self.clicked.emit()
-        self.update()
-        self.scene().update()
-        self.setZValue(1)
-        super().mousePressEvent(event)
\ No newline at end of file
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event) -> None:
+        super().mouseMoveEvent(event)
+        self.moved.emit()
\ No newline at end of file
@@ -1,16 +1,44 @@
 from typing import Dict, List, Optional, Union, Tuple
 import numpy as np
 import pyqtgraph as pg
-from PySide6.QtCore import Signal, QTimer
+from PySide6.QtCore import Qt, Signal, QTimer
 from PySide6.QtGui import QFont
 
 # Change absolute imports to relative imports
 from config import config
+from utils.color_utils import palette_index
+from utils.compact import QuantizedArray, compact_timestamps, compact_values
+from utils.lod import MinMaxPyramid
+from utils.ring_buffer import RingBuffer
+from utils.ticks import TickCache, format_ticks, unit_affixes
 from utils.utils import (
-    find_furthest_color,
     CustomDateAxisItem,
-    round_to_significant
+    NearestIndex
 )
+from widgets.hover import HoverBuffer, HoverMarkers
+
+
+def shared_view(values) -> np.ndarray:
+    """
+    Read-only view of series data, copying only to convert non-numeric input.
+
+    Values are stored at full precision; rounding to decimal_precision
+    happens when they are formatted for display.
+    """
+    if isinstance(values, QuantizedArray):
+        return values
+    array = np.asarray(values)
+    if array.dtype.kind not in "fiu":
+        array = array.astype(np.float64)
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def _root_buffer(array: np.ndarray) -> np.ndarray:
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
 
 
 class HarmonicPlot(pg.PlotWidget):
@@ -20,7 +48,7 @@ class HarmonicPlot(pg.PlotWidget):
     Supports datetime and numerical x-axes, multiple y-axes, and interactive features.
     """
     
-    mouse_moved_signal = Signal(dict)
+    mouse_moved_signal = Signal(object)
 
     def __init__(
         self,
@@ -43,25 +71,41 @@ class HarmonicPlot(pg.PlotWidget):
         bg_color.setAlpha(config.chart.background_opacity)
         self.setBackground(bg_color)
         self.available_colors = config.chart.color_palette.copy()
-        if x_vals is not None and not is_datetime:
-            self.x_vals = np.round(x_vals, config.performance.decimal_precision)
-        elif x_vals is not None:
-            self.x_vals = x_vals
+        self.palette = palette_index(tuple(config.chart.color_palette)).fresh()
+        self.tick_cache = TickCache()
+        self._axis_ticks = {}
+        self.live = None
+        self.live_rows = {}
+        self._live_dirty = set()
+        self._live_timer = QTimer(self)
+        self._live_timer.setSingleShot(True)
+        rate = config.performance.live_refresh_rate
+        self._live_timer.setInterval(max(1, round(1000 / rate)) if rate else 0)
+        self._live_timer.timeout.connect(self._flush_live)
+        self.x_vals = None
+        if x_vals is not None:
+            if config.performance.compact_storage:
+                x_vals = compact_timestamps(x_vals)
+            self.x_vals = shared_view(x_vals)
+        self.sparkline = False
+        self._pending_mouse_pos = None
+        self._mouse_timer = QTimer(self)
+        self._mouse_timer.setSingleShot(True)
+        self._mouse_timer.setTimerType(Qt.PreciseTimer)
+        rate = config.performance.ratelimit_mouse
+        self._mouse_timer.setInterval(max(1, round(1000 / rate)) if rate else 0)
+        self._mouse_timer.timeout.connect(self._flush_mouse_move)
         if enable_mouseover:
-            self.scene().sigMouseMoved.connect(self._on_mouse_move)
+            self.scene().sigMouseMoved.connect(self._queue_mouse_move)
 
-        self.scatter = pg.ScatterPlotItem(
-            size=config.chart.scatter_dot_size,
-            pen=pg.mkPen(config.chart.scatter_pen), 
-            brush=pg.mkBrush(*config.chart.scatter_brush_color, config.chart.scatter_opacity),
-            pxMode=config.chart.scatter_px_mode
-        )
+        self.markers = HoverMarkers()
+        self.hover = HoverBuffer()
+        self.hover.x_axis = 'date' if is_datetime else 'index'
 
 
         self.plot_item = self.getPlotItem()
         self.plot_item.showGrid(x=True, y=True, alpha=config.chart.grid_alpha)
         self.plot_item.setClipToView(config.chart.clip_to_view)
-        self.plot_item.addItem(self.scatter)
         self.plot_item.getAxis('left').setZValue(config.chart.axis_z_value)
         self.plot_item.getAxis('bottom').setZValue(config.chart.axis_z_value)
         font = QFont(config.font.family, config.font.value_label_size)
@@ -70,6 +114,10 @@ class HarmonicPlot(pg.PlotWidget):
         self.plot_item.layout.setContentsMargins(*config.chart.plot_margins)
         self.vb = self.plot_item.vb
         self.vb.sigResized.connect(self.updateViews)
+        self.vb.sigRangeChanged.connect(self._reset_hover)
+        self.vb.sigYRangeChanged.connect(self.update_axis_ticks)
+        self.vb.sigXRangeChanged.connect(self._update_lod)
+        self.vb.sigResized.connect(self._update_lod)
         self.vb.setMouseEnabled(
             x=config.chart.enable_x_mouse,
             y=config.chart.enable_y_mouse
@@ -82,7 +130,8 @@ class HarmonicPlot(pg.PlotWidget):
         self.first_plot = True
         self.units = {}
         self.color_map = {}
-        self.scatters = {}
+        self.lines = {}
+        self.lods = {}
         self.left_units = None
         self.right_vb = pg.ViewBox()
         self.right_axis = None
@@ -96,6 +145,17 @@ class HarmonicPlot(pg.PlotWidget):
         if is_datetime:
             self.plot_item.getAxis('bottom').setLabel('Date')
 
+    @property
+    def x_vals(self) -> Optional[np.ndarray]:
+        """X-axis values shared by all series."""
+        return self._x_vals
+
+    @x_vals.setter
+    def x_vals(self, values: Optional[np.ndarray]) -> None:
+        self._x_vals = values
+        self.x_index = NearestIndex(values, assume_sorted=self.live is not None) if values is not None else None
+        self._last_hover_idx = None
+
     def tick_value_loop(
         self,
         values: np.ndarray,
@@ -113,22 +173,7 @@ class HarmonicPlot(pg.PlotWidget):
         Returns:
             List containing major and minor tick value pairs
         """
-        major_ticks = []
-        minor_ticks = []
-        
-        for val in values:
-            if abs(val) >= 1000000:
-                text = f"{prefix}{val/1000000:.1f}M {suffix}"
-                major_ticks.append((val, text))
-            elif abs(val) >= 1000:
-                text = f"{prefix}{val/1000:.1f}K {suffix}"
-                major_ticks.append((val, text))
-            else:
-                text = f"{prefix}{int(val)} {suffix}"
-                minor_ticks.append((val, text))
-                
-        return [major_ticks, minor_ticks]
-
+        return format_ticks(values, prefix, suffix)
 
     def format_tick_values(self, values: np.ndarray) -> List[List[Tuple[float, str]]]:
         """
@@ -140,43 +185,33 @@ class HarmonicPlot(pg.PlotWidget):
         Returns:
             Formatted tick values with appropriate units
         """
-        prefix = ''
-        suffix = ''
-        if self.left_units:
-            if self.left_units == '$':
-                prefix = f"{self.left_units} "
+        return self.tick_value_loop(values, *unit_affixes(self.left_units))
 
-            else:
-                suffix = f"{self.left_units}"
-        return self.tick_value_loop(values, prefix, suffix)        
+    def update_axis_ticks(self, *args) -> None:
+        """
+        Update axis ticks for the current view range of each value axis.
 
-    def update_axis_ticks(self) -> None:
-        """Update axis ticks with formatted values based on current view range."""
+        Ticks come from a cache keyed by range, axis length and units, and
+        are only pushed to an axis when they differ from what it shows.
+        """
         if self.left_axis:
-            view_range = self.left_axis.range
-            min_val, max_val = view_range
-            
-            range_size = max_val - min_val
-            magnitude = 10 ** np.floor(np.log10(range_size))
-            
-            if range_size / magnitude >= 5:
-                step = magnitude
-            elif range_size / magnitude >= 2:
-                step = magnitude / 2
-            else:
-                step = magnitude / 5
-            
-            start = round_to_significant(min_val - (min_val % step))
-            end = round_to_significant(max_val + step)
-            tick_values = np.arange(start, end, step)
-            
-            tick_values = tick_values[(tick_values >= min_val) & (tick_values <= max_val)]
-            
-            formatted_ticks = self.format_tick_values(tick_values)
-            self.left_axis.setTicks(formatted_ticks)
-            
-            if self.right_axis:
-                self.right_axis.setTicks(formatted_ticks)
+            self._push_ticks(self.left_axis, self.left_units)
+        if self.right_axis:
+            self._push_ticks(self.right_axis, self.right_units)
+
+    def _push_ticks(self, axis: pg.AxisItem, units: Optional[str]) -> None:
+        """Set cached ticks on axis unless it already shows them."""
+        min_val, max_val = axis.range
+        ticks = self.tick_cache.ticks(
+            min_val,
+            max_val,
+            axis.geometry().height(),
+            config.chart.min_tick_spacing,
+            *unit_affixes(units)
+        )
+        if self._axis_ticks.get(id(axis)) is not ticks:
+            self._axis_ticks[id(axis)] = ticks
+            axis.setTicks(ticks)
 
     def wheelEvent(self, ev) -> None:
         """Handle mouse wheel events for zooming."""
@@ -206,7 +241,8 @@ class HarmonicPlot(pg.PlotWidget):
         y_vals: np.ndarray,
         data_label: Optional[str] = None,
         units: Optional[str] = None,
-        plot_on_right: bool = False
+        plot_on_right: bool = False,
+        color: Optional[str] = None
     ) -> None:
         """
         Add new data lines to the plot.
@@ -216,11 +252,23 @@ class HarmonicPlot(pg.PlotWidget):
             data_label: Label for the data series
             units: Units for the data series
             plot_on_right: Whether to plot on right axis
+            color: Line color, picked from the palette when omitted
         """
-        y_vals = np.round(y_vals, config.performance.decimal_precision)
+        y_vals = shared_view(y_vals)
+        if config.performance.compact_storage and isinstance(y_vals, np.ndarray) and y_vals.dtype == np.float64:
+            y_vals = shared_view(compact_values(
+                y_vals,
+                config.performance.decimal_precision,
+                config.performance.quantize_values
+            ))
 
         if self.x_vals is None:
             raise ValueError("x_vals must be set before adding new lines")
+        pyramid = self._build_lod(y_vals)
+        if pyramid is None and isinstance(y_vals, QuantizedArray):
+            # Drawn raw, the curve needs every sample decoded anyway, so keep
+            # the decoded series as the only copy rather than codes alongside it
+            y_vals = shared_view(compact_values(np.asarray(y_vals), config.performance.decimal_precision))
         if self.first_plot:
             self.first_plot = False
             self.plot_item.getAxis('bottom').setLabel('date' if self.is_datetime else 'Index')
@@ -236,17 +284,42 @@ class HarmonicPlot(pg.PlotWidget):
             else:
                 self.left_units = units
 
-        furthest_color = find_furthest_color(config.chart.color_palette, list(self.color_map.values()))
+        if data_label in self.color_map:
+            self.palette.release(self.color_map[data_label])
+        if color is None:
+            furthest_color = self.palette.take()
+        else:
+            furthest_color = color
+            self.palette.use(color)
         self.color_map[data_label] = furthest_color
 
         pen = pg.mkPen(color=furthest_color, width=2)
-        line = pg.PlotDataItem(
-            self.x_vals, 
-            y_vals,
-            pen=pen,
-            skipFiniteCheck=config.performance.skip_finite_check,
-            downsample=config.chart.downsampling
-        )
+        if pyramid is not None:
+            # Start from the full extent so auto-range sees the whole series
+            line = pg.PlotDataItem(
+                *pyramid.render(self.x_vals[0], self.x_vals[-1], self._lod_pixels()),
+                pen=pen,
+                skipFiniteCheck=config.performance.skip_finite_check
+            )
+            self.lods[data_label] = (line, pyramid)
+        else:
+            line = pg.PlotDataItem(
+                self.x_vals, 
+                np.asarray(y_vals),
+                pen=pen,
+                skipFiniteCheck=config.performance.skip_finite_check,
+                autoDownsample=config.chart.downsampling,
+                downsampleMethod=config.performance.downsampling_mode
+            )
+
+        self.lines[data_label] = line
+        if self.live is not None:
+            self.live_rows[data_label] = self.live.add_row()
+            self.live.set_row(self.live_rows[data_label], y_vals)
+            # The new row reallocated the buffer under every curve
+            self._live_dirty.update(self.live_rows)
+            self._refresh_live()
+            self._flush_live()
 
         if plot_on_right:
             self.has_right_axis = True
@@ -256,6 +329,7 @@ class HarmonicPlot(pg.PlotWidget):
                 self.right_axis = pg.AxisItem('right')
                 self.plot_item.layout.addItem(self.right_axis, 2, 3)
                 self.right_axis.linkToView(self.right_vb)
+                self.right_vb.sigYRangeChanged.connect(self.update_axis_ticks)
                 self.scene().addItem(self.right_vb)
                 self.right_vb.setXLink(self.plot_item.vb)
                 
@@ -280,8 +354,205 @@ class HarmonicPlot(pg.PlotWidget):
             if len(self.plot_info) == 1:
                 self.plot_item.getAxis('left').setLabel('')
         
+        if data_label:
+            self.hover.add(data_label, units, plot_on_right)
+            self.markers.add(data_label, furthest_color, self.right_vb if plot_on_right else self.vb)
+        self._reset_hover()
         self.update_axis_ticks()
 
+    def _build_lod(self, y_vals: np.ndarray) -> Optional[MinMaxPyramid]:
+        """
+        Build a min/max pyramid for a series when peak downsampling applies.
+
+        Returns:
+            The pyramid, or None for short series, unsorted x values or other
+            downsampling modes, which are left to pyqtgraph
+        """
+        if (
+            self.live is not None
+            or not config.chart.downsampling
+            or config.performance.downsampling_mode != "peak"
+            or len(y_vals) < config.performance.lod_min_points
+            or len(y_vals) != len(self.x_vals)
+            or not self.x_index.is_sorted
+        ):
+            return None
+        return MinMaxPyramid(self.x_vals, y_vals, factor=config.performance.lod_factor)
+
+    def _update_lod(self, *args) -> None:
+        """Redraw pyramid-backed series at the resolution of the current view."""
+        if not self.lods:
+            return
+        if self.vb.autoRangeEnabled()[0]:
+            # Auto-range follows the data bounds, so always draw the full extent
+            x_min, x_max = self.x_vals[0], self.x_vals[-1]
+        else:
+            x_min, x_max = self.vb.viewRange()[0]
+        pixels = self._lod_pixels()
+        for line, pyramid in self.lods.values():
+            x, y = pyramid.render(x_min, x_max, pixels)
+            line.setData(x, y)
+
+    def set_sparkline(self, enabled: bool) -> None:
+        """
+        Switch between the full chart and a bare sparkline.
+
+        A sparkline hides the axes and grid, draws its lines without
+        antialiasing and ignores hover, for when the canvas is zoomed too
+        far out to read them.
+
+        Args:
+            enabled: Whether to draw the plot as a sparkline
+        """
+        if enabled == self.sparkline:
+            return
+        self.sparkline = enabled
+        self.plot_item.showAxis('left', not enabled)
+        self.plot_item.showAxis('bottom', not enabled)
+        if self.right_axis is not None:
+            self.right_axis.setVisible(not enabled)
+        self.plot_item.showGrid(x=not enabled, y=not enabled, alpha=config.chart.grid_alpha)
+        antialias = config.chart.antialiasing and not enabled
+        for line in self.lines.values():
+            line.opts['antialias'] = antialias
+            line.updateItems(styleUpdate=True)
+        if enabled:
+            self._mouse_timer.stop()
+            self._pending_mouse_pos = None
+            self._last_hover_idx = None
+            self.markers.hide()
+
+    def _lod_pixels(self) -> int:
+        """Width of the plot area in device pixels."""
+        return int(max(self.vb.width(), self.width()) * self.devicePixelRatioF())
+
+    def _queue_mouse_move(self, evt) -> None:
+        """
+        Coalesce raw mouse moves into at most ratelimit_mouse updates per second.
+
+        Only the latest position is kept; it is processed when the timer fires,
+        so a burst of move events between two repaints costs a single update.
+
+        Args:
+            evt: Mouse event data from sigMouseMoved
+        """
+        if self.sparkline:
+            return
+        self._pending_mouse_pos = evt
+        if not self._mouse_timer.isActive():
+            self._mouse_timer.start()
+
+    def _flush_mouse_move(self) -> None:
+        """Process the most recent queued mouse position."""
+        pos, self._pending_mouse_pos = self._pending_mouse_pos, None
+        if pos is not None:
+            self._on_mouse_move(pos)
+
+    def _reset_hover(self, *args) -> None:
+        """Force the next hover to redraw, e.g. after the view or the series changed."""
+        self._last_hover_idx = None
+
+    def append_points(self, x_vals: np.ndarray, values: Dict[str, np.ndarray]) -> None:
+        """
+        Append live samples to x and the named series.
+
+        The first call moves the plot into live mode: x and every series are
+        copied once into a shared RingBuffer holding at most
+        config.performance.live_window samples, and later appends write only
+        the new samples. Curves are redrawn at most
+        config.performance.live_refresh_rate times per second, and only for
+        the series that received points unless the window slid.
+
+        Args:
+            x_vals: New x values, ascending and after the current last x value
+            values: New y values per series label; series left out get NaN
+        """
+        x_vals = np.atleast_1d(np.asarray(x_vals, dtype=np.float64))
+        unknown = set(values) - set(self.plot_info)
+        if unknown:
+            raise ValueError(f"unknown series {sorted(unknown)}, add them with addNewLines first")
+        if self.live is None:
+            self._start_live()
+
+        block = np.full((self.live.rows, len(x_vals)), np.nan)
+        block[0] = x_vals
+        for label, y in values.items():
+            block[self.live_rows[label]] = y
+        moved = self.live.append(block)
+        # Series left out only gained NaN, so their curves stay as drawn
+        # until the window drops or moves samples under them
+        self._live_dirty.update(self.live_rows if moved else values)
+        self._refresh_live()
+        if not self._live_timer.isActive():
+            self._live_timer.start()
+
+    def _start_live(self) -> None:
+        """Copy the current series into a ring buffer and drop their pyramids."""
+        x = self.x_vals if self.x_vals is not None else np.empty(0)
+        labels = list(self.plot_info)
+        self.live = RingBuffer(
+            1 + len(labels),
+            config.performance.live_window,
+            initial_capacity=max(len(x), 1024)
+        )
+        self.live_rows = {label: i + 1 for i, label in enumerate(labels)}
+        self.live.append(np.vstack([x] + [self.plot_info[label] for label in labels]))
+        for line, _ in self.lods.values():
+            line.setDownsampling(auto=config.chart.downsampling, method=config.performance.downsampling_mode)
+        self.lods.clear()
+
+    def _refresh_live(self) -> None:
+        """Point x and plot_info at the current live window."""
+        self.x_vals = self.live.view(0)
+        for label, row in self.live_rows.items():
+            self.plot_info[label] = self.live.view(row)
+
+    def _flush_live(self) -> None:
+        """Redraw the curves of the series that changed since the last redraw."""
+        labels, self._live_dirty = self._live_dirty, set()
+        for label in labels:
+            self.lines[label].setData(self.x_vals, self.plot_info[label])
+
+    def memory_report(self) -> Dict[str, object]:
+        """
+        Bytes held by this chart's series data.
+
+        Arrays are attributed to the buffer that owns their memory, so x
+        shared by every series, y stored as views of the caller's arrays and
+        curves drawn from slices of them are each counted once.
+
+        Returns:
+            Bytes for x, each series, the level-of-detail pyramids, the live
+            ring buffer and the arrays held by the rendered curves, plus the
+            deduplicated total
+        """
+        seen = {}
+
+        def owned(array: Optional[np.ndarray]) -> int:
+            if isinstance(array, QuantizedArray):
+                array = array.codes
+            if not isinstance(array, np.ndarray):
+                return 0
+            root = _root_buffer(array)
+            if id(root) in seen:
+                return 0
+            seen[id(root)] = root
+            return root.nbytes
+
+        live = owned(self.live._data) if self.live is not None else 0
+        x = owned(self.x_vals)
+        series = {label: owned(data) for label, data in self.plot_info.items()}
+        lod = sum(pyramid.nbytes() for _, pyramid in self.lods.values())
+        curves = sum(owned(line.xData) + owned(line.yData) for line in self.lines.values())
+        return {
+            'x': x,
+            'series': series,
+            'lod': lod,
+            'live': live,
+            'curves': curves,
+            'total': x + sum(series.values()) + lod + live + curves
+        }
+
     def _on_mouse_move(self, evt) -> None:
         """
         Handle mouse movement events for hover effects.
@@ -299,42 +570,28 @@ class HarmonicPlot(pg.PlotWidget):
             mouse_x = mouse_point.x()
             
             if self.x_vals is not None and len(self.x_vals) > 0:
-                idx = min(range(len(self.x_vals)), 
-                         key=lambda i: abs(self.x_vals[i] - mouse_x))
-                
-                scatter_points = []
-                for label, data in self.plot_info.items():
+                idx = self.x_index.nearest(mouse_x)
+                if idx == self._last_hover_idx:
+                    return
+                self._last_hover_idx = idx
+
+                hover = self.hover
+                precision = config.performance.decimal_precision
+                x = float(self.x_vals[idx])
+                hover.index = idx
+                hover.x = x if self.is_datetime else round(x, precision)
+                for slot, label in enumerate(hover.labels):
+                    data = self.plot_info[label]
                     if idx < len(data):
                         y = float(data[idx])
-                        
-                        if label in self.right_axis_items:
-                            vb = self.right_vb
-                        else:
-                            vb = self.vb
-                            
-                        point = vb.mapFromView(pg.Point(self.x_vals[idx], y))
-                        scene_point = vb.mapToScene(point)
-                        view_point = self.vb.mapSceneToView(scene_point)
-                        
-                        scatter_points.append({
-                            'pos': (view_point.x(), view_point.y()),
-                            'brush': pg.mkBrush(self.color_map.get(label, '#FFFFFF'))
-                        })
-                
-                self.scatter.setData(spots=scatter_points)
-                
-                values = {
-                    label: {
-                        'value': data[idx],
-                        'units': self.units.get(label),
-                        'right_axis': label in self.right_axis_items,
-                        'x': self.x_vals[idx],
-                        'x_axis': 'date' if self.is_datetime else 'index'
-                    } 
-                    for label, data in self.plot_info.items() 
-                    if idx < len(data)
-                }
-                if values:
-                    self.mouse_moved_signal.emit(values)
+                        hover.values[slot] = round(y, precision)
+                        # Markers live in their series' view box, so data coordinates place them
+                        self.markers.move(label, x, y)
+                    else:
+                        hover.values[slot] = np.nan
+                        self.markers.hide(label)
+                if len(hover):
+                    self.mouse_moved_signal.emit(hover)
         else:
-            self.scatter.clear()
\ No newline at end of file
+            self._last_hover_idx = None
+            self.markers.hide()
\ No newline at end of file
@@ -1,12 +1,57 @@
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import List, Optional
+import math
 from PySide6.QtWidgets import (
     QWidget,
     QHBoxLayout,
     QGridLayout,
     QLabel
 )
-from PySide6.QtCore import Qt, QSize, Slot
+from PySide6.QtCore import Qt, QPointF, QRectF, QSize, Slot
+from PySide6.QtGui import QColor, QFont, QFontMetricsF, QPainter, QStaticText, QTransform
 from config import config
+from widgets.hover import HoverBuffer
+
+
+@lru_cache(maxsize=4096)
+def format_value(value: float, units: Optional[str] = None) -> str:
+    """
+    Format numbers with appropriate notation, memoized.
+
+    Hover values are rounded to decimal_precision, so the same few values
+    repeat while the mouse sweeps a chart.
+
+    Args:
+        value: Number to format
+        units: Optional units to append
+
+    Returns:
+        Formatted string representation
+    """
+    if units == '$':
+        if value >= 1000000:
+            return f"${config.header.million_format.format(value/1000000)}"
+        elif value >= 1000:
+            return f"${config.header.thousand_format.format(value/1000)}"
+        else:
+            return f"${config.header.decimal_format.format(value)}"
+    else:
+        if value >= 1000000:
+            return f"{config.header.million_format.format(value/1000000)}{units if units else ''}"
+        elif value >= 1000:
+            return f"{config.header.thousand_format.format(value/1000)}{units if units else ''}"
+        else:
+            return f"{config.header.decimal_format.format(value)}{units if units else ''}"
+
+
+@lru_cache(maxsize=None)
+def value_label_style(color: str) -> str:
+    """Stylesheet for a value label in a series color, built once per color."""
+    return f"""
+            font-size: {config.font.value_label_size}px;
+            color: {color};
+            background-color: transparent;
+            """
 
 
 class HeaderWidget(QWidget):
@@ -38,6 +83,8 @@ class HeaderWidget(QWidget):
         self.value_labels = {}
         self.static_labels = {}
         self.dynamic_values = {}
+        self.value_colors = {}
+        self.value_texts = {}
         self.max_cols = config.header.max_columns
         
         self._setup_background()
@@ -123,17 +170,17 @@ class HeaderWidget(QWidget):
         """
         self.connected_widget = plot_widget
 
-    def _create_value_labels(self, values: Dict) -> None:
+    def _create_value_labels(self, labels: List[str]) -> None:
         """
         Create initial layout with static labels.
 
         Args:
-            values: Dictionary of values to display
+            labels: Series labels to display
         """
         label_width = int(self.parent_width * config.header.label_width_ratio)
         label_height = int(self.parent_height * config.header.label_height_ratio)
         
-        for i, (label, data) in enumerate(values.items()):
+        for i, label in enumerate(labels):
             if label not in self.static_labels:
                 static_label = self._create_static_label(
                     label,
@@ -145,8 +192,8 @@ class HeaderWidget(QWidget):
                     label_height
                 )
                 
-                row = i % (len(values) // 2 + len(values) % 2)
-                col = i // (len(values) // 2 + len(values) % 2) * 2
+                row = i % (len(labels) // 2 + len(labels) % 2)
+                col = i // (len(labels) // 2 + len(labels) % 2) * 2
                 
                 self.values_grid.setHorizontalSpacing(config.header.grid_horizontal_spacing)
                 self.values_grid.setVerticalSpacing(config.header.grid_vertical_spacing)
@@ -213,28 +260,18 @@ class HeaderWidget(QWidget):
         Returns:
             Formatted string representation
         """
-        if units == '$':
-            if value >= 1000000:
-                return f"${config.header.million_format.format(value/1000000)}"
-            elif value >= 1000:
-                return f"${config.header.thousand_format.format(value/1000)}"
-            else:
-                return f"${config.header.decimal_format.format(value)}"
-        else:
-            if value >= 1000000:
-                return f"{config.header.million_format.format(value/1000000)}{units if units else ''}"
-            elif value >= 1000:
-                return f"{config.header.thousand_format.format(value/1000)}{units if units else ''}"
-            else:
-                return f"{config.header.decimal_format.format(value)}{units if units else ''}"
-
-    @Slot(dict)
-    def update_values(self, values: Dict) -> None:
+        return format_value(value, units)
+
+    @Slot(object)
+    def update_values(self, values: HoverBuffer) -> None:
         """
         Update displayed values.
 
+        Series colors are applied when they change, not on every hover, and
+        only labels whose text changed are touched.
+
         Args:
-            values: Dictionary of new values to display
+            values: Hover buffer of the connected plot, only valid during this call
         """
         if not self.connected_widget:
             return
@@ -242,20 +279,198 @@ class HeaderWidget(QWidget):
         color_map = self.connected_widget.color_map
         
         if not self.static_labels:
-            self._create_value_labels(values)
+            self._create_value_labels(values.labels)
         
-        for label, data in values.items():
-            if label in self.dynamic_values:
-                value = data['value']
-                units = data['units']
-                formatted_value = self._format_number(value, units)
-                color = color_map.get(label, '#FFFFFF')
-                
-                self.dynamic_values[label].setStyleSheet(
-                    f"""
-                    font-size: {config.font.value_label_size}px;
-                    color: {color};
-                    background-color: transparent;
-                    """
-                )
-                self.dynamic_values[label].setText(formatted_value)
\ No newline at end of file
+        for label, value, units in zip(values.labels, values.values, values.units):
+            value_label = self.dynamic_values.get(label)
+            if value_label is None or math.isnan(value):
+                continue
+            color = color_map.get(label, '#FFFFFF')
+            if self.value_colors.get(label) != color:
+                self.value_colors[label] = color
+                value_label.setStyleSheet(value_label_style(color))
+            text = format_value(float(value), units)
+            if self.value_texts.get(label) != text:
+                self.value_texts[label] = text
+                value_label.setText(text)
+
+
+class PaintedHeaderWidget(QWidget):
+    """
+    Header that paints its title, series names and values itself.
+
+    A drop-in alternative to HeaderWidget for charts with many series: it
+    has no child widgets or layouts, draws every string from a cached
+    QStaticText, and a hover repaints only the cells whose value changed.
+    Series that do not fit are summarised in a final "+N more" cell.
+    """
+
+    def __init__(
+        self,
+        title: str = "Title",
+        parent_width: int = 0,
+        parent_height: int = 0
+    ) -> None:
+        """
+        Initialize the painted header.
+
+        Args:
+            title: Title text to display
+            parent_width: Width of parent container
+            parent_height: Height of parent container
+        """
+        super().__init__()
+        self.parent_width = parent_width
+        self.parent_height = parent_height
+        self.connected_widget = None
+        self.setFixedSize(parent_width, parent_height)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+        self.background = QColor(config.title.background_color)
+        self.background.setAlpha(config.title.background_opacity)
+        self.text_color = QColor(config.font.color)
+        self.title_font = QFont(config.font.family)
+        self.title_font.setPixelSize(config.font.size)
+        self.value_font = QFont(config.font.family)
+        self.value_font.setPixelSize(config.font.value_label_size)
+        self.metrics = QFontMetricsF(self.value_font)
+
+        self.margin_h = parent_width * config.header.margin_horizontal_ratio
+        self.margin_v = parent_height * config.header.margin_vertical_ratio
+        self.values_left = parent_width * config.header.values_position_ratio
+        self.cell_width = parent_width * config.header.label_width_ratio
+        self.row_height = self.metrics.height() + config.header.grid_vertical_spacing
+        self.gap = config.header.grid_horizontal_spacing / 2
+
+        title_width = parent_width * config.header.title_width_ratio
+        self.title = self._static_text(
+            QFontMetricsF(self.title_font).elidedText(title, Qt.ElideRight, title_width),
+            self.title_font
+        )
+        self.series_count = 0
+        self.labels: List[str] = []
+        self.names: List[QStaticText] = []
+        self.values: List[QStaticText] = []
+        self.texts: List[str] = []
+        self.colors: List[Optional[QColor]] = []
+        self.color_names: List[Optional[str]] = []
+        self.cells: List[QRectF] = []
+        self.overflow: Optional[QStaticText] = None
+        self.overflow_cell: Optional[QRectF] = None
+
+    @staticmethod
+    def _static_text(text: str, font: QFont) -> QStaticText:
+        static = QStaticText(text)
+        static.setTextFormat(Qt.PlainText)
+        static.prepare(QTransform(), font)
+        return static
+
+    def set_connected_widget(self, plot_widget) -> None:
+        """
+        Set the plot widget to connect for value updates.
+
+        Args:
+            plot_widget: HarmonicPlot instance to connect
+        """
+        self.connected_widget = plot_widget
+
+    def _set_series(self, labels: List[str]) -> None:
+        """Lay out one cell per series, column by column, keeping the last cell for overflow."""
+        rows = max(1, int((self.parent_height - 2 * self.margin_v) // self.row_height))
+        columns = max(1, int((self.parent_width - self.values_left - self.margin_h) // self.cell_width))
+        capacity = rows * columns
+        shown = len(labels) if len(labels) <= capacity else capacity - 1
+        used_rows = min(rows, max(len(labels), 1))
+        top = (self.parent_height - used_rows * self.row_height) / 2
+
+        def cell(i: int) -> QRectF:
+            return QRectF(
+                self.values_left + (i // rows) * self.cell_width,
+                top + (i % rows) * self.row_height,
+                self.cell_width,
+                self.row_height
+            )
+
+        half = self.cell_width / 2 - self.gap
+        self.series_count = len(labels)
+        self.labels = list(labels[:shown])
+        self.names = [
+            self._static_text(self.metrics.elidedText(f"{label}:", Qt.ElideRight, half), self.value_font)
+            for label in self.labels
+        ]
+        self.values = [self._static_text('', self.value_font) for _ in self.labels]
+        self.texts = [''] * shown
+        self.colors = [None] * shown
+        self.color_names = [None] * shown
+        self.cells = [cell(i) for i in range(shown)]
+        if shown < len(labels):
+            self.overflow = self._static_text(f"+{len(labels) - shown} more", self.value_font)
+            self.overflow_cell = cell(shown)
+        else:
+            self.overflow = None
+            self.overflow_cell = None
+        self.update()
+
+    @Slot(object)
+    def update_values(self, values: HoverBuffer) -> None:
+        """
+        Update displayed values, repainting only the cells that changed.
+
+        Args:
+            values: Hover buffer of the connected plot, only valid during this call
+        """
+        if not self.connected_widget:
+            return
+        if len(values.labels) != self.series_count:
+            self._set_series(values.labels)
+
+        color_map = self.connected_widget.color_map
+        dirty = QRectF()
+        for slot, label in enumerate(self.labels):
+            value = values.values[slot]
+            if math.isnan(value):
+                continue
+            color = color_map.get(label, '#FFFFFF')
+            changed = False
+            if self.color_names[slot] != color:
+                self.color_names[slot] = color
+                self.colors[slot] = QColor(color)
+                changed = True
+            text = format_value(float(value), values.units[slot])
+            if self.texts[slot] != text:
+                self.texts[slot] = text
+                self.values[slot].setText(text)
+                changed = True
+            if changed:
+                dirty = dirty.united(self.cells[slot])
+        if not dirty.isEmpty():
+            self.update(dirty.toAlignedRect())
+
+    def paintEvent(self, event) -> None:
+        """Paint the background, title and the series cells inside the exposed area."""
+        exposed = QRectF(event.rect())
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), self.background)
+        painter.setPen(self.text_color)
+
+        title_size = self.title.size()
+        title_pos = QPointF(self.margin_h, (self.parent_height - title_size.height()) / 2)
+        if exposed.intersects(QRectF(title_pos, title_size)):
+            painter.setFont(self.title_font)
+            painter.drawStaticText(title_pos, self.title)
+
+        painter.setFont(self.value_font)
+        for slot, cell in enumerate(self.cells):
+            if not exposed.intersects(cell):
+                continue
+            middle = cell.left() + cell.width() / 2
+            name = self.names[slot]
+            painter.setPen(self.text_color)
+            painter.drawStaticText(QPointF(middle - self.gap - name.size().width(), cell.top()), name)
+            if self.colors[slot] is not None:
+                painter.setPen(self.colors[slot])
+                painter.drawStaticText(QPointF(middle + self.gap, cell.top()), self.values[slot])
+        if self.overflow is not None and exposed.intersects(self.overflow_cell):
+            painter.setPen(self.text_color)
+            painter.drawStaticText(self.overflow_cell.topLeft() + QPointF(self.gap, 0), self.overflow)
+        painter.end()
@@ -0,0 +1,100 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtWidgets import QGraphicsEllipseItem, QGraphicsItem
+
+from config import config
+
+
+class HoverBuffer:
+    """
+    Reusable hover payload sent through HarmonicPlot.mouse_moved_signal.
+
+    One slot per series, in the order the series were added. The same
+    object is filled in place and re-emitted on every hover, so receivers
+    must read it inside their slot and not keep a reference for later.
+    """
+
+    def __init__(self) -> None:
+        self.labels: List[str] = []
+        self.units: List[Optional[str]] = []
+        self.right_axis: List[bool] = []
+        self.values = np.empty(0)
+        self.slots: Dict[str, int] = {}
+        self.index = -1
+        self.x = np.nan
+        self.x_axis = 'index'
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def add(self, label: str, units: Optional[str], right_axis: bool) -> int:
+        """
+        Reserve a slot for a series, reusing it when the label already exists.
+
+        Returns:
+            Index of the series' slot in values
+        """
+        slot = self.slots.get(label)
+        if slot is None:
+            slot = len(self.labels)
+            self.slots[label] = slot
+            self.labels.append(label)
+            self.units.append(units)
+            self.right_axis.append(right_axis)
+            self.values = np.append(self.values, np.nan)
+        else:
+            self.units[slot] = units
+            self.right_axis[slot] = right_axis
+        return slot
+
+
+class HoverMarkers:
+    """
+    One dot per series that marks the hovered sample.
+
+    Each dot is a fixed pixel-size item living in the view box of its
+    series, so a hover only moves it to the sample's data coordinates. The
+    brush is built once when the series is added.
+    """
+
+    def __init__(self) -> None:
+        size = config.chart.scatter_dot_size
+        self.rect = (-size / 2, -size / 2, size, size)
+        self.pen = pg.mkPen(config.chart.scatter_pen)
+        self.items: Dict[str, QGraphicsEllipseItem] = {}
+        self.boxes: Dict[str, pg.ViewBox] = {}
+
+    def add(self, label: str, color: str, view_box: pg.ViewBox) -> None:
+        """Create, or recolor and re-parent, the dot for a series."""
+        item = self.items.get(label)
+        if item is None:
+            item = QGraphicsEllipseItem(*self.rect)
+            item.setFlag(QGraphicsItem.ItemIgnoresTransformations)
+            item.setPen(self.pen)
+            item.setZValue(config.chart.hover_marker_z_value)
+            item.hide()
+            self.items[label] = item
+        elif self.boxes[label] is not view_box:
+            self.boxes[label].removeItem(item)
+        item.setBrush(pg.mkBrush(color))
+        if self.boxes.get(label) is not view_box:
+            view_box.addItem(item, ignoreBounds=True)
+            self.boxes[label] = view_box
+
+    def move(self, label: str, x: float, y: float) -> None:
+        item = self.items[label]
+        item.setPos(x, y)
+        if not item.isVisible():
+            item.show()
+
+    def hide(self, label: Optional[str] = None) -> None:
+        """Hide one dot, or all of them."""
+        if label is not None:
+            item = self.items.get(label)
+            if item is not None:
+                item.hide()
+            return
+        for item in self.items.values():
+            if item.isVisible():
+                item.hide()
@@ -0,0 +1,111 @@
+import time
+from PySide6.QtWidgets import (
+    QGraphicsItem,
+    QGraphicsProxyWidget,
+    QLabel,
+    QProgressBar,
+    QPushButton,
+    QVBoxLayout,
+    QWidget
+)
+from PySide6.QtCore import QObject, QRectF, QTimer, Signal, Qt
+from PySide6.QtGui import QPen, QColor
+from config import config
+
+
+class PlaceholderObject(QGraphicsItem, QObject):
+    """
+    Canvas placeholder shown while a chart's data is in flight.
+
+    Displays the query title, a busy indicator and the elapsed time. The
+    close button cancels the underlying request.
+    """
+
+    cancel_requested = Signal(object)
+
+    def __init__(self, title: str, width: int = 780, height: int = 420) -> None:
+        """
+        Initialize the placeholder.
+
+        Args:
+            title: Text describing the pending query
+            width: Width of the chart that will replace this placeholder
+            height: Height of the chart that will replace this placeholder
+        """
+        super().__init__()
+        QObject.__init__(self)
+        self.setFlags(QGraphicsItem.ItemIsMovable)
+        self.title = title
+        self.rect = QRectF(0, 0, width, height)
+        self.pen = QPen(QColor(config.draggable.unselected_color), config.draggable.border_width)
+        self._started = time.monotonic()
+
+        self._setup_content(width, height)
+        self._setup_close_button(width)
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self._update_elapsed)
+        self.timer.start(config.placeholder.refresh_interval_ms)
+
+    def _setup_content(self, width: int, height: int) -> None:
+        """Create the title, progress bar and elapsed time labels."""
+        content = QWidget()
+        content.setFixedSize(width, height)
+        content.setStyleSheet(config.placeholder.style)
+        layout = QVBoxLayout(content)
+        layout.setAlignment(Qt.AlignCenter)
+
+        self.title_label = QLabel(self.title)
+        self.title_label.setAlignment(Qt.AlignCenter)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)  # Busy indicator, size of response is unknown
+        self.progress_bar.setFixedWidth(int(width * config.placeholder.progress_width_ratio))
+        self.progress_bar.setTextVisible(False)
+        self.elapsed_label = QLabel()
+        self.elapsed_label.setAlignment(Qt.AlignCenter)
+
+        layout.addWidget(self.title_label)
+        layout.addWidget(self.progress_bar, alignment=Qt.AlignCenter)
+        layout.addWidget(self.elapsed_label)
+
+        self.content_proxy = QGraphicsProxyWidget(self)
+        self.content_proxy.setWidget(content)
+
+    def _setup_close_button(self, width: int) -> None:
+        """Configure the close button that cancels the pending request."""
+        btn_config = config.draggable.close_button
+        self.close_btn = QPushButton("×")
+        self.close_btn.setFixedSize(btn_config['size'], btn_config['size'])
+        self.close_btn.setStyleSheet(btn_config['style'])
+        self.close_btn.clicked.connect(lambda: self.cancel_requested.emit(self))
+
+        self.close_btn_proxy = QGraphicsProxyWidget(self)
+        self.close_btn_proxy.setWidget(self.close_btn)
+        self.close_btn_proxy.setPos(width - btn_config['x_offset'], btn_config['y_offset'])
+
+    def _update_elapsed(self) -> None:
+        self.elapsed_label.setText(f"{time.monotonic() - self._started:.1f}s")
+
+    def set_error(self, message: str) -> None:
+        """Stop the busy indicator and show an error message."""
+        self.timer.stop()
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        self.elapsed_label.setText(message)
+        self.elapsed_label.setStyleSheet(f"color: {config.placeholder.error_color};")
+
+    def remove(self) -> None:
+        """Stop the timer and remove the placeholder from its scene."""
+        self.timer.stop()
+        if self.scene():
+            self.scene().removeItem(self)
+        self.deleteLater()
+
+    def boundingRect(self) -> QRectF:
+        """Return the bounding rectangle of the placeholder."""
+        return self.rect
+
+    def paint(self, painter, option, widget) -> None:
+        """Paint the placeholder border."""
+        painter.setPen(self.pen)
+        painter.drawRect(self.rect)
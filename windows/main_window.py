@@ -8,6 +8,7 @@ from PySide6.QtCore import Qt, QEvent, QRect, QPointF, Signal, QSize
 from PySide6.QtGui import QPainter, QColor, QTransform
 
 from scenes.infinite_canvas import InfiniteCanvas
+from scenes.chart_virtualizer import ChartVirtualizer
 from widgets.canvas_bar import CanvasBarWidget
 from widgets.control_bar import ControlBar
 from widgets.Nyx import Nyx
@@ -93,6 +94,7 @@ class MainWindow(QGraphicsView):
         self.canvases["home"] = self.home_canvas
         self.setScene(self.home_canvas)
         self.current_scene = self.home_canvas
+        self.virtualizer = ChartVirtualizer(self)
 
     def _setup_controls(self) -> None:
         """Create and position control and canvas bars."""
@@ -159,6 +161,7 @@ class MainWindow(QGraphicsView):
             self.current_scene = self.canvases[tab_id]
             self.setScene(self.current_scene)
             self.current_scene_changed.emit(self.current_scene)
+            self.virtualizer.schedule()
 
     def remove_canvas(self, tab_id: str) -> None:
         """Remove a canvas when its tab is closed."""
@@ -181,6 +184,7 @@ class MainWindow(QGraphicsView):
                 new_scale >= self.initial_scale * self.ZOOM_MIN_SCALE):
                 # Only apply zoom if within limits
                 if self.current_scene.handle_wheel_event(event, self):
+                    self.virtualizer.schedule()
                     event.accept()
                     return
         
@@ -220,6 +224,7 @@ class MainWindow(QGraphicsView):
         
         # Make sure controller stays on top
         self.controller.raise_()
+        self.virtualizer.schedule()
 
     def closeEvent(self, event):
         """Clean up resources properly."""